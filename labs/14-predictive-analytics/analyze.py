@@ -1,7 +1,16 @@
 #!/usr/bin/env python3
+import argparse
+
 import pandas as pd
 from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import LabelEncoder
+
+from events import normalize
+from features import HashedFeatures
+from model_store import ModelStore, fingerprint
+
+parser = argparse.ArgumentParser(description="Isolation Forest over sample security events")
+parser.add_argument("--no-cache", action="store_true", help="always refit (skip the model store)")
+args = parser.parse_args()
 
 print("🤖 Lesson 14: AI-Powered Threat Detection")
 print("=========================================")
@@ -16,20 +25,29 @@ data = {
 df = pd.DataFrame(data)
 print(f"📊 Analyzing {len(df)} security events...")
 
-# Feature engineering
-user_encoder = LabelEncoder()
-cloud_encoder = LabelEncoder()
-
-df['user_encoded'] = user_encoder.fit_transform(df['user'])
-df['cloud_encoded'] = cloud_encoder.fit_transform(df['cloud'])
-
-# Prepare features for ML
-X = df[['user_encoded', 'cloud_encoded', 'severity']]
-
-# Train Isolation Forest model
-print("🤖 Training ML model...")
-model = IsolationForest(n_estimators=100, contamination=0.1, random_state=42)
-model.fit(X)
+# Feature engineering: hashed user/cloud/message buckets plus numeric columns,
+# fixed width and stable, so unseen users can be scored without refitting
+encoder = HashedFeatures()
+X = encoder.transform([normalize(r) for r in df.to_dict('records')])
+
+# Warm start: reuse the model trained on these exact features
+params = {'n_estimators': 100, 'contamination': 0.1, 'random_state': 42}
+
+def fit_model():
+    # Train Isolation Forest model
+    print("🤖 Training ML model...")
+    model = IsolationForest(**params)
+    model.fit(X)
+    return {'model': model, 'schema': encoder.columns, 'params': params}
+
+key = fingerprint(X, params, encoder.columns)
+if args.no_cache:
+    bundle, cached = fit_model(), False
+else:
+    bundle, cached = ModelStore().get_or_fit(key, fit_model)
+if cached:
+    print(f"♻️  Loaded cached model {key[:12]}")
+model = bundle['model']
 
 # Generate predictions
 df['anomaly_score'] = model.decision_function(X)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Lesson 14: Behavioural Baselines
+Per-principal streaming sketches that score novelty without a model call
+"""
+
+import argparse
+import hashlib
+import math
+import time
+from array import array
+
+from events import DEFAULT_SOURCES, iter_events
+
+# Novelty components (each 0..1) and their weight in the combined score
+WEIGHTS = {"cloud": 0.3, "message": 0.15, "severity": 0.2, "risk": 0.2, "pivot": 0.15}
+HALF_LIFE = 50  # events per user for the decayed means to forget half their weight
+
+def hash64(key):
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+class CountMinSketch:
+    """Approximate counts for an unbounded key space in depth * width counters.
+
+    Estimates never undercount; they overcount by at most
+    e / width * total with probability 1 - exp(-depth).
+    """
+
+    def __init__(self, width=4096, depth=4):
+        self.width = width
+        self.depth = depth
+        self.table = [array("I", bytes(4 * width)) for _ in range(depth)]
+
+    def _slots(self, key):
+        # Double hashing: depth indexes from one 64-bit hash
+        h = hash64(key)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key, count=1):
+        for row, j in zip(self.table, self._slots(key)):
+            row[j] += count
+
+    def estimate(self, key):
+        return min(row[j] for row, j in zip(self.table, self._slots(key)))
+
+class HyperLogLog:
+    """Distinct-count estimate in 2**p one-byte registers (p=6: 64 bytes, ~13% error)"""
+
+    def __init__(self, p=6):
+        self.p = p
+        self.m = 1 << p
+        self.registers = bytearray(self.m)
+        self.alpha = 0.7213 / (1 + 1.079 / self.m) if self.m >= 128 else {16: 0.673, 32: 0.697, 64: 0.709}[self.m]
+
+    def add(self, value):
+        h = hash64(value)
+        j = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = 64 - self.p - rest.bit_length() + 1
+        if rank > self.registers[j]:
+            self.registers[j] = rank
+
+    def estimate(self):
+        raw = self.alpha * self.m * self.m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * self.m and zeros:
+            return self.m * math.log(self.m / zeros)  # linear counting for small sets
+        return raw
+
+class Ewma:
+    """Exponentially decayed mean and variance"""
+
+    __slots__ = ("mean", "var", "alpha", "n")
+
+    def __init__(self, alpha):
+        self.mean = 0.0
+        self.var = 0.0
+        self.alpha = alpha
+        self.n = 0
+
+    def add(self, x):
+        if self.n == 0:
+            self.mean = float(x)
+        else:
+            diff = x - self.mean
+            incr = self.alpha * diff
+            self.mean += incr
+            self.var = (1 - self.alpha) * (self.var + diff * incr)
+        self.n += 1
+
+    def surprise(self, x):
+        """0..1 for how far x sits above the mean, in standard deviations (4σ → 1)"""
+        if self.n == 0:
+            return 0.0
+        z = (x - self.mean) / math.sqrt(self.var + 1.0)
+        return min(1.0, max(0.0, z / 4))
+
+class Profile:
+    """Everything kept per principal: a few floats and a 64-byte HyperLogLog"""
+
+    __slots__ = ("events", "cloud_events", "message_events", "severity", "risk", "clouds")
+
+    def __init__(self, alpha):
+        self.events = 0
+        self.cloud_events = 0  # events carrying a cloud / a message: the rarity denominators
+        self.message_events = 0
+        self.severity = Ewma(alpha)
+        self.risk = Ewma(alpha)
+        self.clouds = HyperLogLog()
+
+class Baselines:
+    """Per-user behaviour summarized in constant space, updated in O(1) per event.
+
+    User×cloud and user×message frequencies share two count-min
+    sketches, so memory does not grow with the number of pairs; each
+    user keeps decayed severity/risk means and a HyperLogLog of the
+    clouds they have touched.  score() compares an event against that
+    history: an unusual cloud or message for this user, severity or risk
+    above the user's norm, and a cloud the user has never used when they
+    are already active in others (the cross-cloud pivot that
+    correlate_events.sh reports after the fact).
+    """
+
+    def __init__(self, width=4096, depth=4, half_life=HALF_LIFE, weights=None):
+        self.pairs = CountMinSketch(width, depth)
+        self.alpha = 1 - 0.5 ** (1 / half_life)
+        self.weights = dict(WEIGHTS if weights is None else weights)
+        self.profiles = {}
+
+    def _profile(self, user):
+        profile = self.profiles.get(user)
+        if profile is None:
+            profile = self.profiles[user] = Profile(self.alpha)
+        return profile
+
+    def score(self, event):
+        """Novelty components for a normalized event (see events.normalize) and their weighted sum"""
+        user = event["user"]
+        profile = self.profiles.get(user)
+        cloud_key = f"c\x1f{user}\x1f{event['cloud']}"
+        cloud_count = self.pairs.estimate(cloud_key) if event["cloud"] else 0
+
+        def rarity(count, n):
+            # Laplace-smoothed share of this user's events with the field set:
+            # unseen → near 1, habitual → near 0
+            return 1 - (count + 1) / (n + 2)
+
+        parts = {"cloud": 0.0, "message": 0.0, "severity": 0.0, "risk": 0.0, "pivot": 0.0}
+        if profile:
+            if event["cloud"]:
+                parts["cloud"] = rarity(cloud_count, profile.cloud_events)
+                # A cloud this user has never touched, while already active in another
+                if cloud_count == 0 and profile.cloud_events:
+                    parts["pivot"] = 1.0
+            if event["message"]:
+                parts["message"] = rarity(self.pairs.estimate(f"m\x1f{user}\x1f{event['message']}"),
+                                          profile.message_events)
+            parts["severity"] = profile.severity.surprise(event["severity"])
+            parts["risk"] = profile.risk.surprise(event["risk"])
+        parts["novelty"] = sum(self.weights[k] * parts[k] for k in self.weights)
+        return parts
+
+    def update(self, event):
+        user = event["user"]
+        profile = self._profile(user)
+        profile.events += 1
+        profile.severity.add(event["severity"])
+        profile.risk.add(event["risk"])
+        if event["cloud"]:
+            profile.cloud_events += 1
+            self.pairs.add(f"c\x1f{user}\x1f{event['cloud']}")
+            profile.clouds.add(event["cloud"])
+        if event["message"]:
+            profile.message_events += 1
+            self.pairs.add(f"m\x1f{user}\x1f{event['message']}")
+
+    def observe(self, event):
+        """score() against the history so far, then fold the event in"""
+        parts = self.score(event)
+        self.update(event)
+        return parts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-user streaming baselines and novelty scores")
+    parser.add_argument("files", nargs="*", default=list(DEFAULT_SOURCES))
+    parser.add_argument("--threshold", type=float, default=0.35, help="novelty reported as suspicious")
+    parser.add_argument("--show", type=int, default=10, help="suspicious events to print")
+    args = parser.parse_args()
+
+    print("📈 Lesson 14: Behavioural Baselines")
+    print("===================================")
+
+    baselines = Baselines()
+    flagged = []
+    total = 0
+    elapsed = 0.0
+    for path in args.files:
+        for event in iter_events(path):
+            start = time.perf_counter()
+            parts = baselines.observe(event)
+            elapsed += time.perf_counter() - start
+            total += 1
+            if parts["novelty"] >= args.threshold:
+                flagged.append((event, parts))
+
+    print(f"📊 {total} events, {len(baselines.profiles)} principals, "
+          f"{elapsed / max(1, total) * 1e6:.1f} µs per event (score + update)")
+    print(f"🚨 {len(flagged)} events with novelty ≥ {args.threshold}")
+    for event, parts in sorted(flagged, key=lambda f: -f[1]["novelty"])[:args.show]:
+        reasons = ", ".join(k for k in WEIGHTS if parts[k] >= 0.5) or "-"
+        print(f"👤 User: {event['user']} | ☁️ Cloud: {event['cloud'] or '-'} | "
+              f"Novelty: {parts['novelty']:.3f} | {reasons}")
+
+    print("\n☁️  Principals active in more than one cloud:")
+    for user, profile in sorted(baselines.profiles.items()):
+        clouds = profile.clouds.estimate()
+        if clouds > 1.5:
+            print(f"   {user}: ~{clouds:.0f} clouds, {profile.events} events, "
+                  f"severity mean {profile.severity.mean:.2f}")
@@ -1,3 +1,5 @@
 #!/bin/bash
 echo "📊 Building ML dataset for predictive analytics..."
+# Decision logs and cloud events → memory-mappable .npy columns (only new lines are parsed)
+python3 labs/14-predictive-analytics/event_cache.py || exit 1
 echo "✅ Dataset preparation complete"
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Lesson 14: Columnar Event Cache
+JSONL event logs converted once into memory-mappable .npy columns
+"""
+
+import hashlib
+import io
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from events import DEFAULT_SOURCES, normalize
+
+# Normalized event fields (see events.normalize) and their column types;
+# "dict" columns hold uint32 codes into a <name>.dict.json value list
+SCHEMA = {
+    "ts": "int64",  # exact epoch microseconds, MISSING_TS if missing or unparseable
+    "user": "dict",
+    "cloud": "dict",
+    "severity": "int64",
+    "risk": "int64",
+    "device_compliant": "bool",
+    "result": "bool",
+    "message": "dict",
+}
+FORMAT = 2
+MISSING_TS = np.iinfo(np.int64).min
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+FLUSH_ROWS = 100000
+HEAD_BYTES = 4096  # hashed to notice a source rewritten rather than appended to
+
+def cache_dir_for(path):
+    return os.path.splitext(path)[0] + ".cols"
+
+def epoch(ts):
+    """Exact microseconds since the epoch (integer arithmetic; naive times are UTC)"""
+    try:
+        dt = datetime.fromisoformat(ts)
+    except (TypeError, ValueError):
+        return MISSING_TS
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - EPOCH) // timedelta(microseconds=1)
+
+def from_epoch(us):
+    return None if us == MISSING_TS else (EPOCH + timedelta(microseconds=int(us))).isoformat()
+
+def head_hash(path, size):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read(min(size, HEAD_BYTES))).hexdigest()
+
+def append_npy(path, values):
+    """Append a 1-D array to a .npy file, patching the shape in its header"""
+    if not os.path.exists(path):
+        np.save(path, values)
+        return
+    with open(path, "r+b") as f:
+        version = np.lib.format.read_magic(f)
+        read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                       else np.lib.format.read_array_header_2_0)
+        shape, fortran, dtype = read_header(f)
+        header_len = f.tell()
+        header = io.BytesIO()
+        np.lib.format.write_array_header_1_0(header, {
+            "descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": fortran,
+            "shape": (shape[0] + len(values),)})
+        if version == (1, 0) and len(header.getvalue()) == header_len:
+            f.seek(0, os.SEEK_END)
+            f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+            f.seek(0)
+            f.write(header.getvalue())
+            return
+    # The header outgrew its padding: rewrite the whole column once
+    np.save(path, np.concatenate([np.load(path), values.astype(dtype)]))
+
+class EventColumns:
+    """Read-only view of a cache directory; numeric columns are memory-mapped"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.rows = self.meta["rows"]
+        self.arrays = {}
+        self.dictionaries = {}
+        for name, kind in SCHEMA.items():
+            file = os.path.join(path, f"{name}.npy")
+            self.arrays[name] = (np.load(file, mmap_mode="r") if os.path.exists(file)
+                                 else np.empty(0, dtype="uint32" if kind == "dict" else kind))
+            if kind == "dict":
+                with open(os.path.join(path, f"{name}.dict.json")) as f:
+                    self.dictionaries[name] = json.load(f)
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, name):
+        """The column's array (codes for dictionary-encoded columns)"""
+        return self.arrays[name]
+
+    def decode(self, name, rows=slice(None)):
+        """Values of a dictionary-encoded column"""
+        return np.array(self.dictionaries[name], dtype=object)[self.arrays[name][rows]]
+
+    def event(self, i):
+        """Row i as a normalized event dict (ts comes back as UTC ISO 8601)"""
+        e = {}
+        for name, kind in SCHEMA.items():
+            value = self.arrays[name][i]
+            if kind == "dict":
+                e[name] = self.dictionaries[name][value]
+            elif name == "ts":
+                e[name] = from_epoch(value)
+            else:
+                e[name] = value.item()
+        return e
+
+    def is_consistent(self):
+        return all(len(a) == self.rows for a in self.arrays.values())
+
+def sync(source, cache_dir=None):
+    """Bring the cache for source up to date and open it.
+
+    Only bytes appended since the last sync are parsed (complete lines
+    only); a source that shrank or whose first bytes changed is rebuilt.
+    Rows are flushed every FLUSH_ROWS, so memory stays bounded.
+    """
+    cache_dir = cache_dir or cache_dir_for(source)
+    meta_path = os.path.join(cache_dir, "meta.json")
+    size = os.stat(source).st_size
+
+    meta = None
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        stale = (meta.get("format") != FORMAT or size < meta["offset"]
+                 or (meta["offset"] and meta["head"] != head_hash(source, meta["offset"])))
+        if not stale and not EventColumns(cache_dir).is_consistent():
+            stale = True  # interrupted during an earlier append
+        if stale:
+            meta = None
+    if meta is None:
+        if os.path.isdir(cache_dir):
+            for name in os.listdir(cache_dir):
+                os.remove(os.path.join(cache_dir, name))
+        os.makedirs(cache_dir, exist_ok=True)
+        meta = {"format": FORMAT, "source": os.path.abspath(source), "offset": 0, "rows": 0,
+                "head": ""}
+        dictionaries = {name: [] for name, kind in SCHEMA.items() if kind == "dict"}
+    else:
+        dictionaries = {}
+        for name, kind in SCHEMA.items():
+            if kind == "dict":
+                with open(os.path.join(cache_dir, f"{name}.dict.json")) as f:
+                    dictionaries[name] = json.load(f)
+    codes = {name: {v: i for i, v in enumerate(values)} for name, values in dictionaries.items()}
+
+    if size > meta["offset"] or not os.path.exists(meta_path):
+        pending = {name: [] for name in SCHEMA}
+
+        def flush():
+            for name, kind in SCHEMA.items():
+                dtype = "uint32" if kind == "dict" else kind
+                append_npy(os.path.join(cache_dir, f"{name}.npy"), np.array(pending[name], dtype=dtype))
+                pending[name].clear()
+            for name, values in dictionaries.items():
+                with open(os.path.join(cache_dir, f"{name}.dict.json"), "w") as f:
+                    json.dump(values, f)
+            meta["head"] = head_hash(source, meta["offset"])
+            with open(meta_path + ".tmp", "w") as f:
+                json.dump(meta, f)
+            os.replace(meta_path + ".tmp", meta_path)
+
+        with open(source, "rb") as f:
+            f.seek(meta["offset"])
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # a writer is mid-line; pick it up next sync
+                meta["offset"] += len(line)
+                if not line.strip():
+                    continue
+                e = normalize(json.loads(line))
+                for name, kind in SCHEMA.items():
+                    value = e[name]
+                    if kind == "dict":
+                        value = str(value)
+                        code = codes[name].get(value)
+                        if code is None:
+                            code = codes[name][value] = len(dictionaries[name])
+                            dictionaries[name].append(value)
+                        value = code
+                    elif name == "ts":
+                        value = epoch(value)
+                    pending[name].append(value)
+                meta["rows"] += 1
+                if len(pending["ts"]) >= FLUSH_ROWS:
+                    flush()
+        flush()
+    return EventColumns(cache_dir)
+
+if __name__ == "__main__":
+    for source in sys.argv[1:] or DEFAULT_SOURCES:
+        columns = sync(source)
+        print(f"✅ {source} → {columns.path}: {len(columns)} events")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Lesson 14: Security Event Readers
+Chunked, bounded-memory ingest of decision logs and multi-cloud events
+"""
+
+import json
+
+DECISION_LOGS = "labs/10-siem-analytics/decision_logs.jsonl"
+CLOUD_EVENTS = "labs/12-cross-cloud-correlation/multicloud_events.jsonl"
+DEFAULT_SOURCES = (DECISION_LOGS, CLOUD_EVENTS)
+
+def normalize(record):
+    """One event shape for both feeds.
+
+    Decision logs carry risk / device_compliant / result, cloud events
+    carry cloud / severity / message; fields a feed lacks get neutral
+    defaults so both can be scored by the same model.
+    """
+    return {
+        "ts": record.get("ts") or record.get("timestamp"),
+        "user": record.get("user", "unknown"),
+        "cloud": record.get("cloud", ""),
+        "severity": record.get("severity", 0),
+        "risk": record.get("risk", 0),
+        "device_compliant": record.get("device_compliant", True),
+        "result": record.get("result", True),
+        "message": record.get("message", ""),
+    }
+
+def iter_events(path):
+    """Normalized events from a JSONL file, one line at a time"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield normalize(json.loads(line))
+
+def iter_chunks(paths, chunk_size=10000):
+    """Lists of at most chunk_size events across the given files, in order"""
+    chunk = []
+    for path in paths:
+        for event in iter_events(path):
+            chunk.append(event)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Lesson 14: Hashed Event Features
+Fixed-width float32 feature matrices that need no fitted vocabulary
+"""
+
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+# Categorical fields and their hash bucket counts
+BUCKETS = {"user": 64, "cloud": 8, "message": 32}
+
+# Numeric columns, read from normalized events (see events.normalize) or,
+# elementwise, from whole columns of an event_cache.EventColumns
+NUMERIC = {
+    "severity": lambda e: e["severity"],
+    "risk": lambda e: e["risk"],
+    "noncompliant": lambda e: np.logical_not(e["device_compliant"]),
+    "denied": lambda e: np.logical_not(e["result"]),
+}
+
+@lru_cache(maxsize=65536)
+def bucket(field, value, buckets):
+    """Stable bucket for field=value (crc32, unlike hash(), is the same in every process)"""
+    return zlib.crc32(f"{field}={value}".encode()) % buckets
+
+class HashedFeatures:
+    """Encodes events as numeric columns followed by one-hot hash buckets per field.
+
+    Unlike LabelEncoder codes, a value's column never depends on which
+    other values were seen, so a model trained yesterday scores a user
+    who first appeared today, and the width (and memory) stays fixed
+    however many distinct users, clouds or messages the stream holds.
+    Distinct values may share a bucket; widen BUCKETS to make that rarer.
+    """
+
+    def __init__(self, buckets=None, numeric=None):
+        self.buckets = dict(BUCKETS if buckets is None else buckets)
+        self.numeric = dict(NUMERIC if numeric is None else numeric)
+        self.offsets = {}
+        width = len(self.numeric)
+        for field, n in self.buckets.items():
+            self.offsets[field] = width
+            width += n
+        self.width = width
+
+    @property
+    def columns(self):
+        names = list(self.numeric)
+        for field, n in self.buckets.items():
+            names += [f"{field}#{i}" for i in range(n)]
+        return names
+
+    def transform(self, events):
+        """C-contiguous float32 matrix, one row per event"""
+        n = len(events)
+        X = np.zeros((n, self.width), dtype=np.float32)
+        for j, get in enumerate(self.numeric.values()):
+            X[:, j] = np.fromiter((get(e) for e in events), dtype=np.float32, count=n)
+        rows = np.arange(n)
+        for field, buckets in self.buckets.items():
+            cols = np.fromiter((bucket(field, e[field], buckets) for e in events),
+                               dtype=np.intp, count=n)
+            X[rows, self.offsets[field] + cols] = 1.0
+        return X
+
+    def transform_columns(self, columns, start=0, stop=None):
+        """Same matrix as transform() for rows [start, stop) of an EventColumns.
+
+        Numeric features are computed a column at a time and each
+        dictionary value is hashed once, then gathered by code, so no
+        per-event Python objects are built.
+        """
+        stop = len(columns) if stop is None else min(stop, len(columns))
+        n = max(0, stop - start)
+        X = np.zeros((n, self.width), dtype=np.float32)
+        view = {name: columns[name][start:stop] for name in columns.arrays}
+        for j, get in enumerate(self.numeric.values()):
+            X[:, j] = get(view)
+        rows = np.arange(n)
+        for field, buckets in self.buckets.items():
+            table = np.fromiter((bucket(field, v, buckets) for v in columns.dictionaries[field]),
+                                dtype=np.intp, count=len(columns.dictionaries[field]))
+            X[rows, self.offsets[field] + table[view[field]]] = 1.0
+        return X
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Lesson 14: Model Store
+Trained detectors cached on disk, keyed by a fingerprint of their training data
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import sklearn
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".models")
+FORMAT = 1
+
+def fingerprint(data, params, schema=()):
+    """Hex key for (training data, hyperparameters, feature schema, sklearn version).
+
+    data may be a DataFrame (hashed column by column) or anything
+    np.asarray accepts.  Any change to the rows, their order, the
+    parameters or the schema gives a different key.
+    """
+    h = hashlib.sha256()
+    h.update(json.dumps({"format": FORMAT, "sklearn": sklearn.__version__,
+                         "params": params, "schema": list(schema)},
+                        sort_keys=True, default=str).encode())
+    columns = data.items() if hasattr(data, "items") else [("", data)]
+    for name, col in columns:
+        arr = np.asarray(col)
+        h.update(f"{name}:{arr.dtype}:{arr.shape}".encode())
+        if arr.dtype == object:
+            h.update("\0".join(map(str, arr.ravel())).encode())
+        else:
+            h.update(np.ascontiguousarray(arr).tobytes())
+    return h.hexdigest()
+
+class ModelStore:
+    """Directory of pickled model bundles, one file per fingerprint.
+
+    A bundle is a dict (model, feature schema, params).  Reads refresh an
+    entry's mtime, so eviction drops the least recently used entries
+    beyond max_entries and anything unused for max_age_days.  Another
+    process may evict an entry at any moment; a vanished file is a miss.
+    """
+
+    def __init__(self, path=STORE_DIR, max_entries=8, max_age_days=30):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.joblib")
+
+    def get(self, key):
+        path = self._file(key)
+        try:
+            bundle = joblib.load(path)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Truncated or written by an incompatible version: treat as a miss
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # evicted since the load; the bundle in hand is still good
+        return bundle
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # already removed by a concurrent eviction
+
+    def put(self, key, bundle):
+        os.makedirs(self.path, exist_ok=True)
+        path = self._file(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        joblib.dump({**bundle, "created": time.time()}, tmp)
+        os.replace(tmp, path)
+        self.evict()
+
+    def entries(self):
+        """(mtime, path) of every stored bundle, most recently used first"""
+        if not os.path.isdir(self.path):
+            return []
+        found = []
+        for name in os.listdir(self.path):
+            if name.endswith(".joblib"):
+                path = os.path.join(self.path, name)
+                try:
+                    found.append((os.stat(path).st_mtime, path))
+                except FileNotFoundError:
+                    continue
+        return sorted(found, reverse=True)
+
+    def evict(self):
+        now = time.time()
+        for i, (mtime, path) in enumerate(self.entries()):
+            if i >= self.max_entries or now - mtime > self.max_age:
+                self._remove(path)
+
+    def get_or_fit(self, key, fit):
+        """Cached bundle for key, or fit() -> bundle, stored; returns (bundle, hit)"""
+        bundle = self.get(key)
+        if bundle is not None:
+            return bundle, True
+        bundle = fit()
+        self.put(key, bundle)
+        return bundle, False
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Lesson 14: Micro-Batched Anomaly Scoring
+Per-event scoring calls grouped into batches under a latency budget
+"""
+
+import argparse
+import copy
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from events import DEFAULT_SOURCES, iter_events
+from features import HashedFeatures
+
+class MicroBatchScorer:
+    """Collects submit() calls into batches for one decision_function call each.
+
+    A batch is sealed when it holds max_batch events or when its oldest
+    event has waited max_wait_ms, whichever comes first, so no caller
+    waits longer than the budget plus one scoring call.  Each caller gets
+    a Future resolving to its event's anomaly score (negative =
+    anomalous); n_jobs, if set, is passed to the model for parallel
+    scoring of large batches.
+    """
+
+    def __init__(self, model, encoder=None, max_batch=256, max_wait_ms=5.0, n_jobs=None):
+        if n_jobs is not None and "n_jobs" in model.get_params():
+            # A private copy: the caller's model may be shared with other code
+            model = copy.deepcopy(model).set_params(n_jobs=n_jobs)
+        self.model = model
+        self.encoder = encoder or HashedFeatures()
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+
+        self.queue = queue.Queue()
+        self.batches = 0
+        self.events = 0
+        self._closed = False
+        self._lock = threading.Lock()  # makes the closed check and enqueue one step
+        self._worker = threading.Thread(target=self._run, name="micro-batch-scorer", daemon=True)
+        self._worker.start()
+
+    def submit(self, event):
+        """Queue one normalized event (see events.normalize); returns a Future"""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("scorer is closed")
+            self.queue.put((event, future))
+        return future
+
+    def score(self, event, timeout=None):
+        """Blocking form of submit()"""
+        return self.submit(event).result(timeout)
+
+    def _collect(self):
+        first = self.queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self.queue.put(None)  # let the outer loop see the shutdown
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            # Callers may have cancelled their futures while queued
+            live = [(e, f) for e, f in batch if f.set_running_or_notify_cancel()]
+            if not live:
+                continue
+            try:
+                X = self.encoder.transform([e for e, _ in live])
+                scores = self.model.decision_function(X)
+            except Exception as e:
+                for _, f in live:
+                    f.set_exception(e)
+                continue
+            for (_, f), score in zip(live, scores):
+                f.set_result(float(score))
+            self.batches += 1
+            self.events += len(live)
+
+    def close(self):
+        """Score everything already submitted, then stop the worker"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self.queue.put(None)  # nothing can be queued behind the sentinel now
+        self._worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+if __name__ == "__main__":
+    from stream_detect import StreamingDetector
+
+    parser = argparse.ArgumentParser(description="Benchmark micro-batched scoring against per-event calls")
+    parser.add_argument("files", nargs="*", default=list(DEFAULT_SOURCES))
+    parser.add_argument("--callers", type=int, default=32, help="concurrent caller threads")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--n-jobs", type=int)
+    args = parser.parse_args()
+
+    print("⚡ Lesson 14: Micro-Batched Anomaly Scoring")
+    print("===========================================")
+
+    events = [e for path in args.files for e in iter_events(path)]
+    detector = StreamingDetector()
+    detector.process(events)
+    model, encoder = detector.model, detector.encoder
+    print(f"📊 {len(events)} events, {args.callers} concurrent callers")
+
+    def timed(call):
+        def one(event):
+            start = time.perf_counter()
+            call(event)
+            return time.perf_counter() - start
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.callers) as pool:
+            latencies = list(pool.map(one, events))
+        return len(events) / (time.perf_counter() - start), latencies
+
+    def report(name, rate, latencies, extra=""):
+        print(f"   {name:<12} {rate:>9.0f} events/s | p50 {percentile(latencies, 50) * 1000:.2f} ms"
+              f" | p99 {percentile(latencies, 99) * 1000:.2f} ms{extra}")
+
+    rate, latencies = timed(lambda e: model.decision_function(encoder.transform([e])))
+    report("per-event", rate, latencies)
+
+    with MicroBatchScorer(model, encoder, args.max_batch, args.max_wait_ms, args.n_jobs) as scorer:
+        rate, latencies = timed(scorer.score)
+    report("micro-batch", rate, latencies,
+           f" | {scorer.events / max(1, scorer.batches):.1f} events/batch")
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Lesson 14: Streaming Anomaly Detection
+Score event logs chunk by chunk and retrain on a sliding reservoir sample
+"""
+
+import argparse
+import json
+import random
+
+import numpy as np
+from sklearn.ensemble import IsolationForest
+
+from event_cache import sync
+from events import DEFAULT_SOURCES, iter_chunks
+from features import HashedFeatures
+from model_store import ModelStore, fingerprint
+
+class Reservoir:
+    """Fixed-size uniform sample of a stream, biased toward recent rows.
+
+    Plain reservoir sampling (Algorithm R) replaces a slot with
+    probability capacity / seen, which goes to zero on an endless stream.
+    Capping seen at `horizon` keeps that probability at least
+    capacity / horizon, so the sample slides forward and follows drift.
+    """
+
+    def __init__(self, capacity=5000, horizon=None, seed=42):
+        self.capacity = capacity
+        self.horizon = horizon or 10 * capacity
+        self.rows = None  # (capacity, width) float32, allocated on the first row
+        self.size = 0
+        self.seen = 0
+        self.rng = random.Random(seed)
+
+    def add(self, row):
+        if self.rows is None:
+            self.rows = np.empty((self.capacity, len(row)), dtype=np.float32)
+        self.seen += 1
+        if self.size < self.capacity:
+            self.rows[self.size] = row
+            self.size += 1
+            return
+        j = self.rng.randrange(min(self.seen, self.horizon))
+        if j < self.capacity:
+            self.rows[j] = row
+
+    def sample(self):
+        return self.rows[:self.size]
+
+class StreamingDetector:
+    """IsolationForest that scores each chunk, then folds it into the reservoir.
+
+    The first chunk trains the initial model; after that every chunk is
+    scored by the model already in place, and the model is refit on the
+    reservoir every retrain_every events.  Memory is one chunk plus the
+    reservoir, however long the stream.  With a ModelStore, fits on a
+    sample seen before (e.g. the first chunk of a re-run) are loaded
+    instead of refit.
+    """
+
+    def __init__(self, reservoir=5000, retrain_every=50000, contamination=0.1,
+                 n_estimators=100, seed=42, store=None, encoder=None):
+        self.encoder = encoder or HashedFeatures()
+        self.reservoir = Reservoir(reservoir, seed=seed)
+        self.retrain_every = retrain_every
+        self.contamination = contamination
+        self.n_estimators = n_estimators
+        self.seed = seed
+        self.store = store
+        self.model = None
+        self.seen = 0
+        self.trained_at = 0
+        self.retrains = 0
+
+    def train(self):
+        sample = self.reservoir.sample()
+        params = {"n_estimators": self.n_estimators, "contamination": self.contamination,
+                  "random_state": self.seed}
+
+        def fit():
+            model = IsolationForest(**params).fit(sample)
+            return {"model": model, "schema": schema, "params": params}
+
+        schema = self.encoder.columns
+        if self.store:
+            bundle, _ = self.store.get_or_fit(fingerprint(sample, params, schema), fit)
+        else:
+            bundle = fit()
+        self.model = bundle["model"]
+        self.trained_at = self.seen
+        self.retrains += 1
+
+    def _absorb(self, X):
+        for row in X:
+            self.reservoir.add(row)
+        self.seen += len(X)
+
+    def process(self, events):
+        """Anomaly scores for one chunk (negative = anomalous) and whether it retrained"""
+        return self.process_features(self.encoder.transform(events))
+
+    def process_features(self, X):
+        """process() for a chunk already encoded by self.encoder"""
+        if self.model is None:
+            self._absorb(X)
+            self.train()
+            return self.model.decision_function(X), True
+
+        scores = self.model.decision_function(X)
+        self._absorb(X)
+        if self.seen - self.trained_at >= self.retrain_every:
+            self.train()
+            return scores, True
+        return scores, False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming anomaly detection over JSONL event logs")
+    parser.add_argument("files", nargs="*", default=list(DEFAULT_SOURCES),
+                        help="decision_logs.jsonl / multicloud_events.jsonl style files")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--reservoir", type=int, default=5000, help="rows kept for retraining")
+    parser.add_argument("--retrain-every", type=int, default=50000, help="events between refits")
+    parser.add_argument("--contamination", type=float, default=0.1)
+    parser.add_argument("--show", type=int, default=10, help="anomalies to print")
+    parser.add_argument("--out", help="write every anomaly as a JSON line to this file")
+    parser.add_argument("--no-cache", action="store_true", help="always refit (skip the model store)")
+    parser.add_argument("--raw", action="store_true",
+                        help="parse the JSONL directly instead of its .cols column cache")
+    args = parser.parse_args()
+
+    print("🤖 Lesson 14: Streaming Threat Detection")
+    print("========================================")
+
+    store = None if args.no_cache else ModelStore()
+    detector = StreamingDetector(args.reservoir, args.retrain_every, args.contamination,
+                                 store=store)
+    out = open(args.out, "w", encoding="utf-8") if args.out else None
+    total = flagged = 0
+    shown = []
+
+    def chunks():
+        """(size, retrained, [(anomalous event, score)]) per chunk"""
+        if args.raw:
+            for chunk in iter_chunks(args.files, args.chunk_size):
+                scores, retrained = detector.process(chunk)
+                yield len(chunk), retrained, [(e, s) for e, s in zip(chunk, scores) if s < 0]
+            return
+        # Chunks run across file boundaries, as iter_chunks does for --raw
+        segments, size = [], 0
+        for path in args.files:
+            columns = sync(path)
+            start = 0
+            while start < len(columns):
+                take = min(args.chunk_size - size, len(columns) - start)
+                segments.append((columns, start, take))
+                size += take
+                start += take
+                if size == args.chunk_size:
+                    yield score_segments(segments)
+                    segments, size = [], 0
+        if segments:
+            yield score_segments(segments)
+
+    def score_segments(segments):
+        X = np.vstack([detector.encoder.transform_columns(c, start, start + take)
+                       for c, start, take in segments])
+        scores, retrained = detector.process_features(X)
+        rows = [(c, start + i) for c, start, take in segments for i in range(take)]
+        # Only anomalous rows are decoded back into events
+        return len(X), retrained, [(rows[i][0].event(rows[i][1]), scores[i])
+                                   for i in np.flatnonzero(scores < 0)]
+
+    for n, (size, retrained, anomalies) in enumerate(chunks(), 1):
+        total += size
+        flagged += len(anomalies)
+        print(f"📥 Chunk {n}: {size} events, {len(anomalies)} anomalies"
+              + (" | 🔁 model retrained" if retrained else ""))
+        for event, score in anomalies:
+            if out:
+                out.write(json.dumps({**event, "anomaly_score": round(float(score), 6)}) + "\n")
+            if len(shown) < args.show:
+                shown.append((event, score))
+    if out:
+        out.close()
+
+    print(f"\n✅ Scored {total} events, {flagged} anomalies, {detector.retrains} model updates")
+    print("\n🚨 ANOMALIES DETECTED:")
+    for event, score in shown:
+        print(f"👤 User: {event['user']} | ☁️ Cloud: {event['cloud'] or '-'} | Score: {score:.3f}")
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Lesson 14: Behavioural Baseline Regression Tests
+Run directly (python3 test_baselines.py) or under pytest
+"""
+
+from baselines import Baselines
+from events import normalize
+
+def event(user, cloud, message="Login", severity=1):
+    return normalize({"user": user, "cloud": cloud, "message": message, "severity": severity})
+
+def test_two_cloud_habitual_user_is_not_a_pivot():
+    baselines = Baselines()
+    for i in range(200):
+        baselines.update(event("alice", "aws" if i % 5 < 3 else "gcp"))  # 60% aws, 40% gcp
+    for cloud in ("aws", "gcp"):
+        parts = baselines.score(event("alice", cloud))
+        assert parts["pivot"] == 0.0
+        assert parts["cloud"] < 0.7
+
+    parts = baselines.score(event("alice", "azure"))
+    assert parts["pivot"] == 1.0
+    assert parts["cloud"] > 0.99
+
+def test_rarity_ignores_events_without_the_field():
+    baselines = Baselines()
+    for _ in range(100):
+        baselines.update(normalize({"user": "bob", "risk": 10}))  # decision logs: no cloud
+    baselines.update(event("bob", "aws"))
+    baselines.update(event("bob", "aws"))
+    assert baselines.score(event("bob", "aws"))["cloud"] < 0.5
+
+if __name__ == "__main__":
+    tests = [(name, f) for name, f in list(globals().items()) if name.startswith("test_")]
+    for name, test in tests:
+        test()
+        print(f"✅ {name}")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Lesson 14: Columnar Event Cache Regression Tests
+Run directly (python3 test_event_cache.py) or under pytest
+"""
+
+import json
+import os
+import tempfile
+from datetime import datetime
+
+from event_cache import epoch, sync
+
+RECORDS = [
+    {"timestamp": "2025-10-08T00:51:00.123456-07:00", "user": "monitor", "cloud": "aws",
+     "severity": 40000, "message": "Security group modification"},
+    {"ts": "1969-12-31T23:59:59.999999+00:00", "user": "user4", "risk": 2**40,
+     "device_compliant": False, "result": False},
+    {"ts": "2262-04-11T23:47:16+00:00", "user": "user0", "risk": -70000},
+    {"user": "nobody"},
+]
+
+def test_round_trip_preserves_large_values_and_timestamps():
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "events.jsonl")
+        with open(source, "w") as f:
+            for record in RECORDS[:2]:
+                f.write(json.dumps(record) + "\n")
+        sync(source)
+        with open(source, "a") as f:  # the incremental path must round-trip too
+            for record in RECORDS[2:]:
+                f.write(json.dumps(record) + "\n")
+        columns = sync(source)
+
+        assert len(columns) == len(RECORDS)
+        for i, record in enumerate(RECORDS):
+            e = columns.event(i)
+            assert e["severity"] == record.get("severity", 0)
+            assert e["risk"] == record.get("risk", 0)
+            ts = record.get("ts") or record.get("timestamp")
+            if ts is None:
+                assert e["ts"] is None
+            else:
+                assert datetime.fromisoformat(e["ts"]) == datetime.fromisoformat(ts)
+                assert epoch(e["ts"]) == epoch(ts)
+
+if __name__ == "__main__":
+    tests = [(name, f) for name, f in list(globals().items()) if name.startswith("test_")]
+    for name, test in tests:
+        test()
+        print(f"✅ {name}")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Lesson 15: Vectorized Path Scoring
+score_path() for millions of paths in one NumPy call
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from graph_index import load_graph
+
+PAD = -1  # fills the tail of rows in a padded path matrix
+
+class BatchScorer:
+    """Scores paths against a CompiledGraph with array lookups only.
+
+    Node ids are integers from graph.lookup(), -1 for ids not in the
+    graph (score_path counts no edge risk for them and falls back to a
+    weight of 1).  Per-node tier weights and source risks and a sorted
+    table of (src, dst) pair keys with their edge-risk weight are built
+    once; scoring a batch is then a handful of gathers and one
+    searchsorted over its hops.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        n = graph.num_nodes
+
+        tiers = np.frombuffer(graph.attrs["tier"], dtype=np.uint32)
+        self.tier_weight = np.asarray(graph.tier_weights, dtype=np.int64)[tiers]
+        self.source_risk = np.fromiter((graph.source_risk(u) for u in range(n)),
+                                       dtype=np.int64, count=n)
+
+        # Every CSR entry of a (src, dst) pair carries the same pair risk
+        offsets = np.frombuffer(graph.offsets, dtype=np.uint32).astype(np.int64)
+        targets = np.frombuffer(graph.targets, dtype=np.uint32).astype(np.int64)
+        risk = np.frombuffer(graph.risk, dtype=np.uint32)
+        sources = np.repeat(np.arange(n, dtype=np.int64), np.diff(offsets))
+        keys, first = np.unique(sources * n + targets, return_index=True)
+        self.pair_keys = keys
+        self.pair_weight = np.asarray(graph.risk_weights, dtype=np.int64)[risk[first]]
+
+    def encode(self, paths):
+        """Lists of node ids -> (offsets, nodes) with -1 for unknown ids"""
+        lookup = self.graph.index.get
+        offsets = np.zeros(len(paths) + 1, dtype=np.int64)
+        np.cumsum([len(p) for p in paths], out=offsets[1:])
+        nodes = np.fromiter((lookup(name, -1) for p in paths for name in p),
+                            dtype=np.int64, count=int(offsets[-1]))
+        return offsets, nodes
+
+    def score_flat(self, offsets, nodes):
+        """Scores of the paths nodes[offsets[i]:offsets[i+1]], as int64"""
+        offsets = np.asarray(offsets, dtype=np.int64)
+        nodes = np.asarray(nodes, dtype=np.int64)
+        starts, ends = offsets[:-1], offsets[1:]
+        lengths = ends - starts
+        if len(lengths) and lengths.min() < 1:
+            raise ValueError("paths must have at least one node")
+
+        # Hop j joins nodes[j] -> nodes[j+1]; hops across path boundaries don't count
+        u, v = nodes[:-1], nodes[1:]
+        hop = (u >= 0) & (v >= 0)
+        hop[ends[:-1] - 1] = False
+        weight = np.zeros(len(u), dtype=np.int64)
+        if len(self.pair_keys) and hop.any():
+            keys = u[hop] * self.graph.num_nodes + v[hop]
+            at = np.searchsorted(self.pair_keys, keys).clip(max=len(self.pair_keys) - 1)
+            weight[hop] = np.where(self.pair_keys[at] == keys, self.pair_weight[at], 0)
+
+        # Per-path bonus from a prefix sum over the hops
+        acc = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(weight, out=acc[1:len(nodes)])
+        bonus = acc[ends - 1] - acc[starts]
+
+        base = np.maximum(1, 8 - lengths)
+        head, tail = nodes[starts], nodes[ends - 1]
+        tier_weight = np.where(tail >= 0, self.tier_weight[tail.clip(min=0)], 1)
+        source_risk = np.where(head >= 0, self.source_risk[head.clip(min=0)], 1)
+        return (base + bonus) * tier_weight * source_risk
+
+    def score_matrix(self, matrix, lengths=None):
+        """Scores of the rows of a path matrix padded with PAD.
+
+        Without lengths a row's path ends at its first PAD; pass lengths
+        to keep -1 entries inside a path as unknown nodes.
+        """
+        matrix = np.asarray(matrix, dtype=np.int64)
+        if lengths is None:
+            lengths = np.where((matrix == PAD).any(axis=1),
+                               (matrix == PAD).argmax(axis=1), matrix.shape[1])
+        lengths = np.asarray(lengths, dtype=np.int64)
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        keep = np.arange(matrix.shape[1]) < lengths[:, None]
+        return self.score_flat(offsets, matrix[keep])
+
+    def score_paths(self, paths):
+        """score_path() for each list of node ids in paths"""
+        return self.score_flat(*self.encode(paths))
+
+    def score_tree(self, tree):
+        """PathTree.score() for every entry of tree.targets (see pathfinder.bfs_tree)"""
+        i = np.frombuffer(tree.targets, dtype=np.uint32)
+        node = np.frombuffer(tree.node, dtype=np.uint32)[i]
+        length = np.frombuffer(tree.length, dtype=np.uint16)[i].astype(np.int64)
+        bonus = np.frombuffer(tree.bonus, dtype=np.uint32)[i].astype(np.int64)
+        return (np.maximum(1, 8 - length) + bonus) * self.tier_weight[node] * tree.source_risk
+
+if __name__ == "__main__":
+    import pathfinder
+
+    json_path = sys.argv[1] if len(sys.argv) > 1 else "labs/15-policy-graph/graph.json"
+    graph = pathfinder.graph = load_graph(json_path)
+    scorer = BatchScorer(graph)
+
+    paths = [p for src in pathfinder.principals() for p in pathfinder.bfs_paths(src)]
+    print(f"🧮 Scoring {len(paths)} paths from {json_path}")
+
+    start = time.perf_counter()
+    expected = [pathfinder.score_path(p) for p in paths]
+    loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    offsets, nodes = scorer.encode(paths)
+    encode = time.perf_counter() - start
+    start = time.perf_counter()
+    scores = scorer.score_flat(offsets, nodes)
+    vector = time.perf_counter() - start
+
+    print(f"   score_path loop: {loop:.4f}s")
+    print(f"   encode:          {encode:.4f}s")
+    print(f"   score_flat:      {vector:.4f}s")
+    if scores.tolist() != expected:
+        print("❌ Batch scores differ from score_path")
+        sys.exit(1)
+    print("✅ Batch scores match score_path")
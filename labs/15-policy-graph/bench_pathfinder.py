@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Lesson 15: Pathfinder Benchmark
+Seeded synthetic policy graphs and per-stage timings as JSON
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+import pathfinder
+from graph_index import load_graph
+
+try:
+    from batch_score import BatchScorer
+except ImportError:  # NumPy is optional; the score_batch stage is skipped without it
+    BatchScorer = None
+
+# Share of nodes per layer, in graph.json's users -> roles -> policies -> PEPs -> services/data shape
+LAYERS = (("user", 0.40), ("role", 0.06), ("policy", 0.06), ("pep", 0.03),
+          ("service", 0.20), ("data", 0.25))
+RISKS = ("low", "med", "high", "critical")
+
+def parse_mix(text):
+    """'public=1,internal=4' -> {"public": 1.0, "internal": 4.0}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+def generate_graph(path, nodes, seed=42, fanout=3, risk_density=0.05,
+                   tier_mix=None, attacker_share=0.001):
+    """Write a synthetic policy graph as a JSONL edge list; returns counts"""
+    rng = random.Random(seed)
+    tier_mix = tier_mix or {"public": 1, "internal": 4, "confidential": 3, "restricted": 2}
+    tiers, tier_weights = list(tier_mix), list(tier_mix.values())
+
+    layers = {}
+    start = 0
+    for kind, share in LAYERS:
+        count = max(1, int(nodes * share))
+        layers[kind] = range(start, start + count)
+        start += count
+
+    prefix = {"user": "user", "role": "role", "policy": "policy", "pep": "pep",
+              "service": "svc", "data": "db"}
+    attackers = {i for i in layers["user"] if rng.random() < attacker_share}
+
+    def ref(kind, i):
+        # score_path treats user ids containing "attacker" as hostile sources
+        if kind == "user" and i in attackers:
+            return f"user:attacker{i}"
+        return f"{prefix[kind]}:{kind}{i}"
+
+    counts = {"nodes": 0, "edges": 0, "risk_edges": 0}
+    with open(path, "w", encoding="utf-8") as f:
+        def emit(record):
+            f.write(json.dumps(record) + "\n")
+
+        for kind, ids in layers.items():
+            for i in ids:
+                node = {"id": ref(kind, i), "type": kind}
+                if kind == "user":
+                    node["department"] = "external" if i in attackers else "engineering"
+                if kind in ("service", "data"):
+                    node["tier"] = rng.choices(tiers, tier_weights)[0]
+                emit(node)
+                counts["nodes"] += 1
+
+        chain = [("user", "role", "ASSIGNED"), ("role", "policy", "GOVERNS"),
+                 ("policy", "pep", "ENFORCES"), ("pep", "service", "FRONTS"),
+                 ("service", "data", "QUERIES")]
+        for src_kind, dst_kind, rel in chain:
+            dst_ids = layers[dst_kind]
+            for i in layers[src_kind]:
+                for _ in range(rng.randint(1, fanout)):
+                    emit({"src": ref(src_kind, i), "dst": ref(dst_kind, rng.choice(dst_ids)),
+                          "rel": rel})
+                    counts["edges"] += 1
+
+        # Risky shortcuts that bypass enforcement, as in graph.json
+        shortcuts = [("role", "data", "CAN_QUERY_DIRECT"), ("role", "service", "CAN_CALL_DIRECT"),
+                     ("user", "service", "EXPLOITS")]
+        total = sum(len(layers[k]) for k, _, _ in shortcuts)
+        for _ in range(int(total * risk_density)):
+            src_kind, dst_kind, rel = rng.choice(shortcuts)
+            emit({"src": ref(src_kind, rng.choice(layers[src_kind])),
+                  "dst": ref(dst_kind, rng.choice(layers[dst_kind])),
+                  "rel": rel, "risk": rng.choice(RISKS)})
+            counts["edges"] += 1
+            counts["risk_edges"] += 1
+    return counts
+
+def process_peak_rss_kb():
+    """High-water mark of the whole process so far, not of one stage: a stage
+    that stays below an earlier (or an earlier run's) peak reports that peak"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+def stage(results, name, fn, count_of=len, unit="paths"):
+    start = time.perf_counter()
+    out = fn()
+    wall = time.perf_counter() - start
+    count = count_of(out)
+    results[name] = {
+        "wall_s": round(wall, 6),
+        "results": count,
+        f"{unit}_per_s": round(count / wall, 1) if wall > 0 else None,
+        "process_peak_rss_kb": process_peak_rss_kb(),
+    }
+    return out
+
+def run_benchmark(nodes, workdir, seed=42, fanout=3, risk_density=0.05, tier_mix=None,
+                  sources=20, explain_limit=1000, top_k=10):
+    path = os.path.join(workdir, f"bench-{nodes}-{seed}.jsonl")
+    run = {"nodes": nodes, "seed": seed, "fanout": fanout, "risk_density": risk_density,
+           "stages": {}}
+    stages = run["stages"]
+
+    run["graph"] = stage(stages, "generate",
+                         lambda: generate_graph(path, nodes, seed, fanout, risk_density, tier_mix),
+                         count_of=lambda c: c["edges"], unit="edges")
+    graph = stage(stages, "compile", lambda: load_graph(path),
+                  count_of=lambda g: g.num_edges, unit="edges")
+    stage(stages, "load", lambda: load_graph(path), count_of=lambda g: g.num_edges, unit="edges")
+    pathfinder.graph = graph
+
+    users = pathfinder.principals(("user",))
+    sample = random.Random(seed).sample(users, min(sources, len(users)))
+    run["sources"] = len(sample)
+
+    paths = stage(stages, "bfs_paths",
+                  lambda: [p for src in sample for p in pathfinder.bfs_paths(src)])
+    stage(stages, "bfs_tree", lambda: [pathfinder.bfs_tree(src) for src in sample],
+          count_of=lambda trees: sum(len(t.targets) for t in trees if t))
+    stage(stages, "score_path", lambda: [pathfinder.score_path(p) for p in paths])
+    if BatchScorer:
+        scorer = BatchScorer(graph)
+        stage(stages, "score_batch", lambda: scorer.score_paths(paths))
+    stage(stages, "explain_path", lambda: [pathfinder.explain_path(p) for p in paths[:explain_limit]])
+    stage(stages, "top_k_paths",
+          lambda: [p for src in sample for p in pathfinder.top_k_paths(src, top_k)])
+    stage(stages, "path_stats", lambda: [pathfinder.path_stats(src) for src in sample],
+          count_of=lambda stats: sum(s["paths"] for s in stats))
+
+    os.remove(path)
+    os.remove(os.path.splitext(path)[0] + ".idx")
+    return run
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the attack path analyzer")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="graph sizes to generate (e.g. 1000 1000000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--fanout", type=int, default=3, help="max edges per node per layer")
+    parser.add_argument("--risk-density", type=float, default=0.05,
+                        help="risky shortcut edges per user/role node")
+    parser.add_argument("--tier-mix", type=parse_mix,
+                        default="public=1,internal=4,confidential=3,restricted=2")
+    parser.add_argument("--sources", type=int, default=20, help="users sampled as BFS sources")
+    parser.add_argument("--explain-limit", type=int, default=1000)
+    parser.add_argument("--workdir", default=tempfile.gettempdir())
+    args = parser.parse_args()
+
+    report = {"python": sys.version.split()[0], "runs": []}
+    for n in args.nodes:
+        print(f"⏱️  Benchmarking {n} nodes...", file=sys.stderr)
+        report["runs"].append(run_benchmark(n, args.workdir, args.seed, args.fanout,
+                                            args.risk_density, args.tier_mix, args.sources,
+                                            args.explain_limit))
+    json.dump(report, sys.stdout, indent=2)
+    print()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Lesson 15: Choke-Point Analysis
+Smallest sets of edges or roles whose removal cuts untrusted sources off from sensitive data
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import deque
+
+from graph_index import load_graph
+
+GRAPH_PATH = os.environ.get("ZT_POLICY_GRAPH") or \
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "graph.json")
+
+class FlowNetwork:
+    """Directed graph with integer capacities for Dinic's max-flow.
+
+    Arcs are stored in flat lists; arc a and its residual twin a ^ 1 are
+    added together, and head/nxt chain the arcs leaving each vertex.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.head = [-1] * n
+        self.nxt = []
+        self.to = []
+        self.cap = []
+
+    def add_arc(self, u, v, cap):
+        for a, b, c in ((u, v, cap), (v, u, 0)):
+            self.nxt.append(self.head[a])
+            self.head[a] = len(self.to)
+            self.to.append(b)
+            self.cap.append(c)
+        return len(self.to) - 2
+
+    def _levels(self, s, t):
+        level = [-1] * self.n
+        level[s] = 0
+        q = deque([s])
+        head, nxt, to, cap = self.head, self.nxt, self.to, self.cap
+        while q:
+            u = q.popleft()
+            a = head[u]
+            while a != -1:
+                v = to[a]
+                if cap[a] > 0 and level[v] < 0:
+                    level[v] = level[u] + 1
+                    q.append(v)
+                a = nxt[a]
+        return level if level[t] >= 0 else None
+
+    def max_flow(self, s, t):
+        """Dinic's algorithm with an iterative DFS (no recursion limit on deep graphs)"""
+        nxt, to, cap = self.nxt, self.to, self.cap
+        flow = 0
+        while True:
+            level = self._levels(s, t)
+            if level is None:
+                return flow
+            it = list(self.head)  # next arc to try per vertex
+            path = []
+            u = s
+            while True:
+                if u == t:
+                    pushed = min(cap[a] for a in path)
+                    for a in path:
+                        cap[a] -= pushed
+                        cap[a ^ 1] += pushed
+                    flow += pushed
+                    path.clear()
+                    u = s
+                    continue
+                a = it[u]
+                while a != -1 and (cap[a] <= 0 or level[to[a]] != level[u] + 1):
+                    a = nxt[a]
+                it[u] = a
+                if a != -1:
+                    path.append(a)
+                    u = to[a]
+                    continue
+                # Dead end: retreat and skip the arc that led here
+                if not path:
+                    break
+                level[u] = -1
+                a = path.pop()
+                u = to[a ^ 1]
+                it[u] = nxt[it[u]]
+
+    def source_side(self, s):
+        """Vertices reachable from s in the residual graph after max_flow()"""
+        seen = [False] * self.n
+        seen[s] = True
+        stack = [s]
+        while stack:
+            u = stack.pop()
+            a = self.head[u]
+            while a != -1:
+                v = self.to[a]
+                if self.cap[a] > 0 and not seen[v]:
+                    seen[v] = True
+                    stack.append(v)
+                a = self.nxt[a]
+        return seen
+
+def edge_costs(graph):
+    """Cost of revoking each edge: 1 for critical risk up to 6 for an unrated edge.
+
+    Unrated edges are the ordinary access the business relies on, while
+    risky shortcuts are the cheapest to revoke, so the cut prefers them.
+    """
+    top = max(graph.risk_weights)
+    return [1 + top - w for w in graph.risk_weights]
+
+def select_nodes(graph, ids=(), departments=(), tiers=()):
+    """Integer ids of the named nodes, users in the given departments and nodes in the given tiers"""
+    found = {graph.lookup(i) for i in ids} - {None}
+    if departments:
+        dept = graph.codes_for("department", departments)
+        user = graph.codes_for("type", ("user",))
+        col, types = graph.attrs["department"], graph.attrs["type"]
+        found.update(u for u in range(graph.num_nodes) if col[u] in dept and types[u] in user)
+    if tiers:
+        codes = graph.codes_for("tier", tiers)
+        col = graph.attrs["tier"]
+        found.update(u for u in range(graph.num_nodes) if col[u] in codes)
+    return sorted(found)
+
+def min_cut(graph, sources, targets, mode="edges", cut_types=("role",), unit=False):
+    """Cheapest cut separating sources from targets, via max-flow / min-cut.
+
+    mode="edges" cuts (src, dst) permissions, each costing edge_costs()
+    of its risk (1 each with unit=True).  mode="nodes" cuts whole nodes of
+    cut_types, one unit each, by splitting every node into an in and an
+    out vertex.  All paths count, whatever their length; no path is
+    enumerated.  Returns a dict with the cut cost, whether the sources
+    can be separated at all, and the edges or nodes in the cut.
+    """
+    n = graph.num_nodes
+    offsets, targets_, risk = graph.offsets, graph.targets, graph.risk
+    costs = edge_costs(graph)
+    source_set, target_set = set(sources), set(targets)
+    result = {"mode": mode, "sources": len(source_set), "targets": len(target_set),
+              "separable": True, "cost": 0, "cut": []}
+    if not source_set or not target_set:
+        return result
+    if source_set & target_set:
+        result["separable"] = False
+        return result
+
+    if mode == "nodes":
+        cuttable = graph.codes_for("type", cut_types)
+        node_type = graph.attrs["type"]
+        can_cut = [node_type[u] in cuttable and u not in source_set and u not in target_set
+                   for u in range(n)]
+        infinite = sum(can_cut) + 1
+        net = FlowNetwork(2 * n + 2)
+        s, t = 2 * n, 2 * n + 1
+        for u in range(n):
+            net.add_arc(2 * u, 2 * u + 1, 1 if can_cut[u] else infinite)
+            for i in range(offsets[u], offsets[u + 1]):
+                net.add_arc(2 * u + 1, 2 * targets_[i], infinite)
+        for u in source_set:
+            net.add_arc(s, 2 * u, infinite)
+        for u in target_set:
+            net.add_arc(2 * u + 1, t, infinite)
+    else:
+        # One arc per (src, dst) pair: revoking a permission removes all its edges
+        pairs = {}
+        for u in range(n):
+            for i in range(offsets[u], offsets[u + 1]):
+                pairs.setdefault((u, targets_[i]), i)
+        infinite = (len(pairs) if unit else sum(costs[risk[i]] for i in pairs.values())) + 1
+        net = FlowNetwork(n + 2)
+        s, t = n, n + 1
+        for (u, v), i in pairs.items():
+            net.add_arc(u, v, 1 if unit else costs[risk[i]])
+        for u in source_set:
+            net.add_arc(s, u, infinite)
+        for u in target_set:
+            net.add_arc(u, t, infinite)
+
+    flow = net.max_flow(s, t)
+    if flow >= infinite:
+        result["separable"] = False
+        return result
+    result["cost"] = flow
+
+    side = net.source_side(s)
+    ids = graph.ids
+    if mode == "nodes":
+        for u in range(n):
+            if side[2 * u] and not side[2 * u + 1]:
+                result["cut"].append(graph.node_info(u))
+    else:
+        for (u, v), i in pairs.items():
+            if side[u] and not side[v]:
+                entries = graph.edge_entries(u, v)
+                result["cut"].append({"src": ids[u], "dst": ids[v],
+                                      "rel": [graph.edge_attrs(e)["rel"] for e in entries],
+                                      "risk": graph.edge_attrs(i)["risk"] if risk[i] else None,
+                                      "cost": 1 if unit else costs[risk[i]]})
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find choke points between untrusted sources and sensitive data")
+    parser.add_argument("--graph", default=GRAPH_PATH, help="graph file (.json, .jsonl or .pge)")
+    parser.add_argument("--source", action="append", default=[], help="source node id (repeatable)")
+    parser.add_argument("--department", action="append", default=[],
+                        help="treat every user in this department as a source (repeatable)")
+    parser.add_argument("--tier", action="append", default=[],
+                        help="target tier (repeatable, default: restricted and confidential)")
+    parser.add_argument("--cut", choices=("edges", "nodes"), default="edges")
+    parser.add_argument("--cut-type", action="append", default=[],
+                        help="node types --cut nodes may remove (repeatable, default: role)")
+    parser.add_argument("--unit", action="store_true",
+                        help="count cut edges instead of weighting them by risk")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+
+    graph = load_graph(args.graph)
+    if not args.source and not args.department:
+        args.source, args.department = ["user:attacker"], ["external"]
+    tiers = args.tier or ["restricted", "confidential"]
+    sources = select_nodes(graph, args.source, args.department)
+    targets = select_nodes(graph, tiers=tiers)
+    result = min_cut(graph, sources, targets, args.cut, tuple(args.cut_type) or ("role",), args.unit)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        sys.exit(0)
+
+    print("✂️  Zero Trust Choke-Point Analysis")
+    print("==================================")
+    print(f"🎯 {result['sources']} sources → {result['targets']} {'/'.join(tiers)} targets")
+    if not result["separable"]:
+        print("❌ No cut separates them (a source is a target, "
+              "or reaches one without crossing a cuttable node)")
+    elif not result["cut"]:
+        print("✅ Sources already cannot reach any target")
+    else:
+        print(f"🔒 Minimum cut: {len(result['cut'])} {args.cut}, cost {result['cost']}\n")
+        for c in result["cut"]:
+            if args.cut == "nodes":
+                print(f"   {c['id']} ({c.get('type', '?')})")
+            else:
+                risk = f" ⚠️{c['risk'].upper()}" if c["risk"] else ""
+                print(f"   {c['src']} --[{'/'.join(r or '?' for r in c['rel'])}{risk}]--> {c['dst']}"
+                      f" | cost {c['cost']}")
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Lesson 15: Incremental Attack Path Analysis
+Re-analyze only the sources a policy graph edit can affect
+"""
+
+import json
+import sys
+from collections import defaultdict, deque
+
+from graph_index import RISK_WEIGHT, TIER_WEIGHT, load_graph
+
+HIGH_RISK = 15
+
+class IncrementalAnalyzer:
+    """Keeps per-source BFS trees so graph deltas only re-run what they touch.
+
+    For every tracked source we store its BFS parent map (node -> parent,
+    which also gives the discovery depth) and its risky paths.  A reverse
+    index node -> sources that discovered it tells which sources an edit
+    at that node can change; only those are re-searched, and the result
+    is a diff of risky paths (score >= threshold) added and removed.
+    """
+
+    def __init__(self, nodes, edges, sources=None, threshold=HIGH_RISK,
+                 dst_max_types=("data","service"), max_depth=8):
+        self.threshold = threshold
+        self.dst_max_types = dst_max_types
+        self.max_depth = max_depth
+
+        self.nodes = {}
+        self.out = defaultdict(list)  # src -> [[dst, rel, risk], ...] in file order
+        self.rev = defaultdict(lambda: defaultdict(int))  # dst -> {src: edge count}
+        for n in nodes:
+            self.nodes[n["id"]] = dict(n)
+        for e in edges:
+            self._add_edge(e["src"], e["dst"], e.get("rel"), e.get("risk"))
+
+        self.track_principals = sources is None
+        self.parents = {}
+        self.risky = {}
+        self.seen_by = defaultdict(set)
+        self._dirty = set()
+        self._untrack = set()  # tracked principals retyped into something else
+        for src in (self._principals() if sources is None else sources):
+            self._analyze(src)
+
+    @classmethod
+    def from_graph(cls, graph, **kwargs):
+        """Seed from a CompiledGraph (see graph_index.py)"""
+        nodes = [graph.node_info(u) for u in range(graph.num_nodes)]
+        tables = graph.tables
+
+        def edges():
+            for u in range(graph.num_nodes):
+                for i in range(graph.offsets[u], graph.offsets[u + 1]):
+                    yield {"src": graph.ids[u], "dst": graph.ids[graph.targets[i]],
+                           "rel": tables["rel"][graph.rel[i]],
+                           "risk": tables["risk"][graph.edge_risk[i]]}
+
+        return cls(nodes, edges(), **kwargs)
+
+    def _principals(self):
+        return [n for n, d in self.nodes.items() if d.get("type") in ("user", "role")]
+
+    # --- search -------------------------------------------------------
+
+    def _pair_risks(self, u):
+        """dst -> risk weight of u's edges, in one pass over them"""
+        # Last u -> v edge carrying a risk wins, like risk_edge in pathfinder.py
+        risks = {}
+        for dst, _, r in self.out.get(u, ()):
+            if r is not None:
+                risks[dst] = r
+        return {dst: RISK_WEIGHT.get(r, 0) for dst, r in risks.items()}
+
+    def _search(self, src):
+        """BFS from src with pathfinder.bfs_paths semantics"""
+        parent = {src: None}
+        bonus = {src: 0}
+        scored = {}
+        head = self.nodes.get(src, {})
+        source_risk = 3 if head.get("type") == "user" and "attacker" in src else 1
+
+        q = deque([(src, 1)])
+        while q:
+            u, length = q.popleft()
+            if length > self.max_depth:
+                continue
+            node = self.nodes.get(u, {})
+            if node.get("type") in self.dst_max_types and length > 1:
+                tier_weight = TIER_WEIGHT.get(node.get("tier", "internal"), 1)
+                scored[u] = (max(1, 8 - length) + bonus[u]) * tier_weight * source_risk
+            risks = None
+            for v, _, _ in self.out.get(u, ()):
+                if v not in parent:
+                    if risks is None:
+                        risks = self._pair_risks(u)
+                    parent[v] = u
+                    bonus[v] = bonus[u] + risks.get(v, 0)
+                    q.append((v, length + 1))
+        return parent, scored
+
+    def _path(self, parent, v):
+        path = []
+        while v is not None:
+            path.append(v)
+            v = parent[v]
+        return tuple(reversed(path))
+
+    def _analyze(self, src):
+        for v in self.parents.get(src, ()):
+            self.seen_by[v].discard(src)
+        parent, scored = self._search(src)
+        self.parents[src] = parent
+        for v in parent:
+            self.seen_by[v].add(src)
+        old = self.risky.get(src, {})
+        new = {self._path(parent, v): score for v, score in scored.items()
+               if score >= self.threshold}
+        self.risky[src] = new
+        return old, new
+
+    def _drop_source(self, src):
+        for v in self.parents.pop(src, ()):
+            self.seen_by[v].discard(src)
+        return self.risky.pop(src, {})
+
+    # --- deltas -------------------------------------------------------
+
+    def _touch(self, node):
+        self._dirty.update(self.seen_by.get(node, ()))
+
+    def _add_edge(self, src, dst, rel=None, risk=None):
+        self.out[src].append([dst, rel, risk])
+        self.rev[dst][src] += 1
+
+    def flush(self):
+        """Re-analyze sources touched since the last flush; returns the diff"""
+        diff = {"added": [], "removed": []}
+        dirty, self._dirty = self._dirty, set()
+        untrack, self._untrack = self._untrack, set()
+        for src in sorted(dirty | untrack):
+            if src not in untrack and (src in self.nodes or src in self.out):
+                old, new = self._analyze(src)
+            else:
+                old, new = self._drop_source(src), {}
+            for path, score in new.items():
+                if old.get(path) != score:
+                    diff["added"].append((score, list(path)))
+            for path, score in old.items():
+                if new.get(path) != score:
+                    diff["removed"].append((score, list(path)))
+        diff["added"].sort(key=lambda x: -x[0])
+        diff["removed"].sort(key=lambda x: -x[0])
+        return diff
+
+    def add_node(self, node_id, **attrs):
+        """Add a node, or update the attributes of an existing one"""
+        self._touch(node_id)
+        self.nodes[node_id] = {"id": node_id, **attrs}
+        if self.track_principals:
+            if attrs.get("type") in ("user", "role"):
+                self._dirty.add(node_id)
+            elif node_id in self.parents:
+                self._untrack.add(node_id)
+        return self.flush()
+
+    def remove_node(self, node_id):
+        self._touch(node_id)
+        self._dirty.add(node_id)
+        self.nodes.pop(node_id, None)
+        for dst, _, _ in self.out.pop(node_id, ()):
+            self.rev[dst].pop(node_id, None)
+        for src in self.rev.pop(node_id, {}):
+            self.out[src] = [e for e in self.out[src] if e[0] != node_id]
+        if node_id not in self.parents:
+            self._dirty.discard(node_id)
+        return self.flush()
+
+    def add_edge(self, src, dst, rel=None, risk=None):
+        self._touch(src)
+        self._add_edge(src, dst, rel, risk)
+        return self.flush()
+
+    def remove_edge(self, src, dst, rel=None):
+        """Remove src -> dst edges (only those with the given rel, if set)"""
+        self._touch(src)
+        kept = [e for e in self.out.get(src, ()) if not (e[0] == dst and rel in (None, e[1]))]
+        removed = len(self.out.get(src, ())) - len(kept)
+        if removed:
+            self.out[src] = kept
+            self.rev[dst][src] -= removed
+            if not self.rev[dst][src]:
+                del self.rev[dst][src]
+        return self.flush()
+
+    def set_edge_risk(self, src, dst, risk, rel=None):
+        """Change the risk of src -> dst edges (None clears it)"""
+        for e in self.out.get(src, ()):
+            if e[0] == dst and rel in (None, e[1]):
+                e[2] = risk
+        # Scores only move for sources whose BFS tree uses this edge
+        for s in self.seen_by.get(dst, ()):
+            if self.parents[s].get(dst) == src:
+                self._dirty.add(s)
+        return self.flush()
+
+    def apply(self, delta):
+        """Apply one delta record, e.g. {"op": "add_edge", "src": ..., "dst": ...}"""
+        delta = dict(delta)
+        op = delta.pop("op")
+        if op == "add_node":
+            return self.add_node(delta.pop("id"), **delta)
+        if op in ("remove_node", "add_edge", "remove_edge", "set_edge_risk"):
+            if op == "remove_node":
+                delta["node_id"] = delta.pop("id")
+            return getattr(self, op)(**delta)
+        raise ValueError(f"Unknown delta op: {op}")
+
+def print_diff(diff):
+    for score, path in diff["added"]:
+        print(f"   ➕ {score:>2} | {' → '.join(path)}")
+    for score, path in diff["removed"]:
+        print(f"   ➖ {score:>2} | {' → '.join(path)}")
+    if not (diff["added"] or diff["removed"]):
+        print("   (no change in risky paths)")
+
+if __name__ == "__main__":
+    print("🔁 Incremental Attack Path Analyzer")
+    print("===================================")
+
+    graph = load_graph("labs/15-policy-graph/graph.json")
+    analyzer = IncrementalAnalyzer.from_graph(graph)
+    risky = sum(len(p) for p in analyzer.risky.values())
+    print(f"📊 Tracking {len(analyzer.parents)} sources, {risky} risky paths (≥{HIGH_RISK})")
+
+    # Deltas as JSON lines from a file or stdin
+    stream = open(sys.argv[1]) if len(sys.argv) > 1 else sys.stdin
+    for line in stream:
+        if not line.strip():
+            continue
+        delta = json.loads(line)
+        print(f"\n🔧 {delta['op']}: {json.dumps({k: v for k, v in delta.items() if k != 'op'})}")
+        print_diff(analyzer.apply(delta))
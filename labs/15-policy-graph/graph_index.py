@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Lesson 15: Compiled Policy Graph Index
+Array-backed (CSR) form of graph.json, cached in a memory-mappable sidecar
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+
+from graph_stream import iter_graph_records
+
+RISK_WEIGHT = {"critical":5, "high":3, "med":2, "low":1}
+TIER_WEIGHT = {"public":0, "internal":1, "confidential":3, "restricted":5}
+
+# Categorical node columns kept in the index (code 0 = attribute absent)
+NODE_ATTRS = ("type", "tier", "department", "sensitivity")
+
+# Rows up to this out-degree are scanned; longer ones are binary-searched
+SCAN_LIMIT = 16
+
+MAGIC = b"ZTPGIDX2"  # 2: string-table codes widened from uint16 to uint32
+# magic, byte order, nodes, edges, source size, source mtime_ns, strings length
+HEADER = struct.Struct("<8sc7xQQQqQ")
+
+def align8(n):
+    return (n + 7) & ~7
+
+class StringTable:
+    """Interns categorical strings; code 0 is reserved for a missing value"""
+
+    def __init__(self, values=None):
+        self.values = list(values) if values else [None]
+        self.codes = {v: i for i, v in enumerate(self.values) if i}
+
+    def code(self, value):
+        if value is None:
+            return 0
+        c = self.codes.get(value)
+        if c is None:
+            c = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return c
+
+class CompiledGraph:
+    """Policy graph with integer node ids and CSR adjacency.
+
+    offsets[u]..offsets[u+1] index the out-edges of node u; targets, risk,
+    edge_risk and rel are parallel per-edge arrays.  risk holds the code
+    score_path sees for the (src, dst) pair (last edge with a risk wins),
+    edge_risk the edge's own risk for display.
+    """
+
+    def __init__(self, ids, tables, offsets, targets, risk, edge_risk, rel, attrs):
+        self.ids = ids
+        self.tables = tables
+        self.offsets = offsets
+        self.targets = targets
+        self.risk = risk
+        self.edge_risk = edge_risk
+        self.rel = rel
+        self.attrs = attrs
+        self._index = None
+        self._edge_order = None
+        self._reverse = None
+
+        self.risk_weights = [RISK_WEIGHT.get(r, 0) for r in tables["risk"]]
+        self.tier_weights = [1] + [TIER_WEIGHT.get(t, 1) for t in tables["tier"][1:]]
+        self.type_codes = {t: i for i, t in enumerate(tables["type"]) if i}
+
+    @property
+    def num_nodes(self):
+        return len(self.ids)
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    @property
+    def index(self):
+        """Node id -> integer id (built on first use)"""
+        if self._index is None:
+            self._index = {name: i for i, name in enumerate(self.ids)}
+        return self._index
+
+    def lookup(self, name):
+        return self.index.get(name)
+
+    def neighbors(self, u):
+        return self.targets[self.offsets[u]:self.offsets[u + 1]]
+
+    def attr(self, u, name):
+        return self.tables[name][self.attrs[name][u]]
+
+    def codes_for(self, name, values):
+        """Codes of the given attribute values that occur in the graph"""
+        table = self.tables[name]
+        return {i for i, v in enumerate(table) if i and v in values}
+
+    def tier_weight(self, u):
+        return self.tier_weights[self.attrs["tier"][u]]
+
+    def source_risk(self, u):
+        if self.attr(u, "type") == "user" and "attacker" in self.ids[u]:
+            return 3
+        return 1
+
+    @property
+    def edge_order(self):
+        """CSR entries with each row sorted by target (stable, built on first use)"""
+        if self._edge_order is None:
+            order = array("I", range(self.num_edges))
+            key = self.targets.__getitem__
+            for u in range(self.num_nodes):
+                lo, hi = self.offsets[u], self.offsets[u + 1]
+                if hi - lo > SCAN_LIMIT:
+                    order[lo:hi] = array("I", sorted(range(lo, hi), key=key))
+            self._edge_order = order
+        return self._edge_order
+
+    @property
+    def reverse(self):
+        """Incoming CSR (in_offsets, sources), built on first use and kept"""
+        if self._reverse is None:
+            n = self.num_nodes
+            counts = array("I", bytes(4 * (n + 1)))
+            for v in self.targets:
+                counts[v + 1] += 1
+            for v in range(n):
+                counts[v + 1] += counts[v]
+            fill = array("I", counts)
+            sources = array("I", bytes(4 * self.num_edges))
+            for u in range(n):
+                for i in range(self.offsets[u], self.offsets[u + 1]):
+                    v = self.targets[i]
+                    sources[fill[v]] = u
+                    fill[v] += 1
+            self._reverse = (counts, sources)
+        return self._reverse
+
+    def predecessors(self, v):
+        in_offsets, sources = self.reverse
+        return sources[in_offsets[v]:in_offsets[v + 1]]
+
+    def edge_entries(self, u, v):
+        """All CSR entries for u -> v (multi-edges), in file order"""
+        lo, hi = self.offsets[u], self.offsets[u + 1]
+        targets = self.targets
+        if hi - lo <= SCAN_LIMIT:
+            return [i for i in range(lo, hi) if targets[i] == v]
+        order = self.edge_order
+        key = targets.__getitem__
+        start = bisect_left(order, v, lo, hi, key=key)
+        end = bisect_right(order, v, start, hi, key=key)
+        return list(order[start:end])
+
+    def find_edge(self, u, v):
+        """First CSR entry for u -> v, or -1"""
+        entries = self.edge_entries(u, v)
+        return entries[0] if entries else -1
+
+    def edge_attrs(self, i):
+        """rel and risk of CSR entry i, as in graph.json"""
+        return {"rel": self.tables["rel"][self.rel[i]],
+                "risk": self.tables["risk"][self.edge_risk[i]]}
+
+    def node_info(self, u):
+        """Node attributes as a dict, like the entries in graph.json"""
+        info = {"id": self.ids[u]}
+        for name in NODE_ATTRS:
+            value = self.attr(u, name)
+            if value is not None:
+                info[name] = value
+        return info
+
+class GraphBuilder:
+    """Accumulates nodes and edges into compact arrays, one record at a time.
+
+    Nothing but the id index, the string tables and flat per-edge arrays
+    is kept, so a graph can be compiled from a stream (see graph_stream.py)
+    without ever holding its JSON form in memory.
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.index = {}
+        self.tables = {name: StringTable() for name in NODE_ATTRS + ("rel", "risk")}
+        self.attr_codes = {name: array("I") for name in NODE_ATTRS}
+        self.src, self.dst = array("I"), array("I")
+        self.rel, self.own_risk = array("I"), array("I")
+        self.pair_risk = {}  # only (src, dst) pairs that carry a risk
+
+    def intern(self, name):
+        i = self.index.get(name)
+        if i is None:
+            i = self.index[name] = len(self.ids)
+            self.ids.append(name)
+        return i
+
+    def add_node(self, n):
+        u = self.intern(n["id"])
+        for name in NODE_ATTRS:
+            col = self.attr_codes[name]
+            if len(col) <= u:
+                col.extend([0] * (u + 1 - len(col)))
+            # Later duplicates replace earlier ones, as node_details did
+            col[u] = self.tables[name].code(n.get(name))
+
+    def add_edge(self, e):
+        u, v = self.intern(e["src"]), self.intern(e["dst"])
+        self.src.append(u)
+        self.dst.append(v)
+        self.rel.append(self.tables["rel"].code(e.get("rel")))
+        code = self.tables["risk"].code(e.get("risk")) if "risk" in e else 0
+        self.own_risk.append(code)
+        if "risk" in e:
+            self.pair_risk[(u, v)] = code
+
+    def add_records(self, records):
+        """Consume ("node", dict) / ("edge", dict) pairs"""
+        for kind, record in records:
+            if kind == "node":
+                self.add_node(record)
+            else:
+                self.add_edge(record)
+        return self
+
+    def finish(self):
+        n, m = len(self.ids), len(self.src)
+        for col in self.attr_codes.values():
+            col.extend([0] * (n - len(col)))
+
+        # Counting sort by source keeps each node's edges in file order
+        offsets = array("I", [0] * (n + 1))
+        for u in self.src:
+            offsets[u + 1] += 1
+        for u in range(n):
+            offsets[u + 1] += offsets[u]
+        cursor = array("I", offsets[:-1])
+        targets = array("I", [0] * m)
+        risk = array("I", [0] * m)
+        edge_risk = array("I", [0] * m)
+        rels = array("I", [0] * m)
+        for i in range(m):
+            u, v = self.src[i], self.dst[i]
+            j = cursor[u]
+            cursor[u] = j + 1
+            targets[j] = v
+            risk[j] = self.pair_risk.get((u, v), 0)
+            edge_risk[j] = self.own_risk[i]
+            rels[j] = self.rel[i]
+
+        return CompiledGraph(self.ids, {k: t.values for k, t in self.tables.items()},
+                             offsets, targets, risk, edge_risk, rels, self.attr_codes)
+
+def build_graph(nodes, edges):
+    """Compile iterables of node and edge dicts into a CompiledGraph"""
+    builder = GraphBuilder()
+    for n in nodes:
+        builder.add_node(n)
+    for e in edges:
+        builder.add_edge(e)
+    return builder.finish()
+
+def index_path_for(json_path):
+    return os.path.splitext(json_path)[0] + ".idx"
+
+def _columns(graph):
+    cols = [graph.offsets, graph.targets, graph.risk, graph.edge_risk, graph.rel]
+    cols += [graph.attrs[name] for name in NODE_ATTRS]
+    return cols
+
+def save_graph(graph, path, source_stat=None):
+    """Write the index atomically; source_stat ties it to graph.json"""
+    strings = json.dumps({"ids": graph.ids, "tables": graph.tables}).encode()
+    size = source_stat.st_size if source_stat else 0
+    mtime = source_stat.st_mtime_ns if source_stat else 0
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, sys.byteorder[0].encode(), graph.num_nodes,
+                            graph.num_edges, size, mtime, len(strings)))
+        for col in _columns(graph):
+            data = col.tobytes()
+            f.write(data + b"\0" * (align8(len(data)) - len(data)))
+        f.write(strings)
+    os.replace(tmp, path)
+
+def open_graph(path, source_stat=None):
+    """Memory-map an index; returns None if it is missing or stale"""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            return None
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, order, n, m, size, mtime, slen = HEADER.unpack_from(mm, 0)
+    if magic != MAGIC or order != sys.byteorder[0].encode():
+        return None
+    if source_stat and (size, mtime) != (source_stat.st_size, source_stat.st_mtime_ns):
+        return None
+
+    view = memoryview(mm)
+    pos = HEADER.size
+    cols = []
+    # Every column is uint32: CSR offsets and targets, then string-table codes
+    for count in [n + 1, m, m, m, m] + [n] * len(NODE_ATTRS):
+        nbytes = struct.calcsize("I") * count
+        cols.append(view[pos:pos + nbytes].cast("I"))
+        pos += align8(nbytes)
+    strings = json.loads(bytes(view[pos:pos + slen]))
+
+    offsets, targets, risk, edge_risk, rel = cols[:5]
+    attrs = dict(zip(NODE_ATTRS, cols[5:]))
+    return CompiledGraph(strings["ids"], strings["tables"],
+                         offsets, targets, risk, edge_risk, rel, attrs)
+
+def load_graph(json_path, index_path=None):
+    """Load the compiled graph, rebuilding the sidecar if the source changed.
+
+    The source may be graph.json, a JSONL edge list or a packed .pge file;
+    it is read incrementally (graph_stream.py), never as one document.
+    """
+    index_path = index_path or index_path_for(json_path)
+    st = os.stat(json_path)
+    graph = open_graph(index_path, st)
+    if graph is None:
+        builder = GraphBuilder().add_records(iter_graph_records(json_path))
+        save_graph(builder.finish(), index_path, st)
+        graph = open_graph(index_path, st)
+    return graph
+
+if __name__ == "__main__":
+    json_path = sys.argv[1] if len(sys.argv) > 1 else "labs/15-policy-graph/graph.json"
+    graph = load_graph(json_path)
+    print(f"✅ Compiled {json_path}: {graph.num_nodes} nodes, {graph.num_edges} edges")
+    print(f"📦 Index: {index_path_for(json_path)}")
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Lesson 15: Policy Graph Analysis Service
+Keeps the compiled graph loaded and answers path, reachability and score queries as JSON
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pathfinder
+from graph_index import load_graph
+from reachability import load_reachability
+
+DEFAULT_PORT = 8765
+
+class GraphState:
+    """The loaded graph and its reachability index, reloaded when the file changes.
+
+    Queries run under the lock, so a reload never swaps the graph out
+    from under one that is in progress.  A reload that fails (the file
+    is missing, mid-rewrite or malformed) keeps the last good graph in
+    service until the file changes again; reload_error says why.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.stamp = None
+        self.attempted = None  # stamp of the last file read, good or bad: not re-parsed per query
+        self.reloads = 0
+        self.reload_error = None
+        self._reload()  # nothing to fall back on yet, so errors propagate
+
+    def refresh(self):
+        try:
+            self._reload()
+        except Exception as e:
+            self.reload_error = f"{type(e).__name__}: {e}"
+
+    def _reload(self):
+        st = os.stat(self.path)
+        stamp = (st.st_size, st.st_mtime_ns)
+        if stamp == self.attempted:
+            return
+        self.attempted = stamp
+        graph = load_graph(self.path)
+        index = load_reachability(self.path, graph=graph)
+        self.index = index
+        self.tier_masks = {}  # tier -> reachability mask, built on first use
+        pathfinder.graph = graph
+        self.stamp = stamp
+        self.reload_error = None
+        self.loaded_at = time.time()
+        self.reloads += 1
+
+    def health(self, query):
+        graph = pathfinder.graph
+        return {"graph": self.path, "nodes": graph.num_nodes, "edges": graph.num_edges,
+                "loaded_at": self.loaded_at, "reloads": self.reloads,
+                "reload_error": self.reload_error}
+
+    def paths(self, query):
+        """Top-k report per ?src= (repeatable), as pathfinder.py --json prints it"""
+        k = int(query.get("k", ["10"])[0])
+        sources = query.get("src") or ["user:ola"]
+        return {"reports": [pathfinder.path_report(src, k) for src in sources]}
+
+    def reach(self, query):
+        src = query["src"][0]
+        if "tier" in query:
+            tier = query["tier"][0]
+            mask = self.tier_masks.get(tier)
+            if mask is None:
+                mask = self.tier_masks[tier] = self.index.mask("tier", {tier})
+            reachable = self.index.can_reach_any(src, mask)
+            return {"src": src, "tier": tier, "reachable": reachable}
+        dst = query["dst"][0]
+        return {"src": src, "dst": dst, "reachable": self.index.can_reach(src, dst)}
+
+    def score(self, query):
+        """Scores for ?path=a,b,c (repeatable) or a POSTed {"paths": [[...], ...]}"""
+        paths = query.get("paths") or [p.split(",") for p in query.get("path", [])]
+        return {"scores": [pathfinder.score_path(p) for p in paths]}
+
+def body_query(body):
+    """A JSON request body in parse_qs shape: every value a list"""
+    if not isinstance(body, dict):
+        raise TypeError(f"body must be a JSON object, not {type(body).__name__}")
+    return {k: v if isinstance(v, list) else [v] for k, v in body.items()}
+
+ROUTES = {"/health": GraphState.health, "/paths": GraphState.paths,
+          "/reach": GraphState.reach, "/score": GraphState.score}
+
+class GraphRequestHandler(BaseHTTPRequestHandler):
+    state = None  # GraphState, set by serve()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.answer(url.path, parse_qs(url.query))
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            return self.send_json(400, {"error": f"invalid JSON body: {e}"})
+        self.answer(url.path, parse_qs(url.query), body)
+
+    def answer(self, route, query, body=None):
+        handler = ROUTES.get(route)
+        if handler is None:
+            return self.send_json(404, {"error": f"unknown endpoint {route}",
+                                        "endpoints": sorted(ROUTES)})
+        try:
+            if body is not None:
+                query = {**query, **body_query(body)}
+            with self.state.lock:
+                self.state.refresh()
+                result = handler(self.state, query)
+        except KeyError as e:
+            return self.send_json(400, {"error": f"missing parameter {e}"})
+        except (ValueError, TypeError, IndexError) as e:
+            return self.send_json(400, {"error": f"bad request: {e}"})
+        self.send_json(200, result)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def serve(path, host="127.0.0.1", port=DEFAULT_PORT):
+    GraphRequestHandler.state = GraphState(path)
+    server = ThreadingHTTPServer((host, port), GraphRequestHandler)
+    graph = pathfinder.graph
+    print(f"🛰️  Policy graph service on http://{host}:{server.server_port}")
+    print(f"📦 {path}: {graph.num_nodes} nodes, {graph.num_edges} edges")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve attack path analysis over local HTTP")
+    parser.add_argument("--graph", default=pathfinder.GRAPH_PATH,
+                        help="graph file (.json, .jsonl or .pge)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    serve(args.graph, args.host, args.port)
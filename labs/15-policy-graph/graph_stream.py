@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Lesson 15: Streaming Policy Graph Readers
+Incremental node/edge ingest for graph.json, JSONL edge lists and packed binary
+"""
+
+import json
+import os
+import re
+import struct
+import sys
+
+CHUNK = 1 << 20
+NUMBER_START = set("-0123456789")
+DELIMITER = re.compile(r"[,\]}\s]")
+
+# Packed binary edge format (.pge): after MAGIC, a sequence of records
+#   b"S" u32 length, utf-8 bytes        -> defines the next string id
+#   b"N" u32 id, 4 x u32 attribute      -> node (type, tier, department, sensitivity)
+#   b"E" u32 src, u32 dst, u32 rel, u32 risk -> edge
+# Attribute/rel/risk ids of NONE mean the field is absent.
+PACKED_MAGIC = b"ZTPGEDG1"
+PACKED_ATTRS = ("type", "tier", "department", "sensitivity")
+NONE = 0xFFFFFFFF
+U32 = struct.Struct("<I")
+NODE = struct.Struct("<5I")
+EDGE = struct.Struct("<4I")
+
+def _edge_or_node(record):
+    return ("edge" if "src" in record else "node"), record
+
+def iter_json_graph(path, chunk_size=CHUNK):
+    """Yield ("node", dict) / ("edge", dict) from a graph.json document.
+
+    Only the "nodes" and "edges" arrays are walked, one element at a time,
+    so memory is bounded by the read buffer plus the largest element.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buf, pos, eof
+            data = f.read(chunk_size)
+            if not data:
+                eof = True
+            buf = buf[pos:] + data
+            pos = 0
+
+        def peek():
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n":
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return buf[pos] if pos < len(buf) else ""
+                fill()
+
+        def expect(ch):
+            nonlocal pos
+            if peek() != ch:
+                raise ValueError(f"{path}: expected {ch!r} near offset {pos}")
+            pos += 1
+
+        def value():
+            nonlocal pos
+            peek()
+            while True:
+                # A bare number is only complete once a delimiter follows it
+                if buf[pos:pos + 1] in NUMBER_START and not eof and not DELIMITER.search(buf, pos):
+                    fill()
+                    continue
+                try:
+                    obj, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    fill()
+                    continue
+                pos = end
+                return obj
+
+        expect("{")
+        if peek() == "}":
+            return
+        while True:
+            key = value()
+            expect(":")
+            if key in ("nodes", "edges") and peek() == "[":
+                kind = key[:-1]
+                pos += 1
+                if peek() == "]":
+                    pos += 1
+                else:
+                    while True:
+                        yield kind, value()
+                        if peek() == ",":
+                            pos += 1
+                            continue
+                        expect("]")
+                        break
+            else:
+                value()
+            if peek() == ",":
+                pos += 1
+                continue
+            expect("}")
+            return
+
+def iter_jsonl_graph(path):
+    """One node ({"id": ...}) or edge ({"src": ..., "dst": ...}) per line"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield _edge_or_node(json.loads(line))
+
+def iter_packed_graph(path):
+    strings = []
+    with open(path, "rb") as f:
+        if f.read(len(PACKED_MAGIC)) != PACKED_MAGIC:
+            raise ValueError(f"{path}: not a packed policy graph")
+
+        while True:
+            tag = f.read(1)
+            if not tag:
+                return
+            if tag == b"S":
+                (n,) = U32.unpack(f.read(U32.size))
+                strings.append(f.read(n).decode("utf-8"))
+            elif tag == b"N":
+                node_id, *attrs = NODE.unpack(f.read(NODE.size))
+                node = {"id": strings[node_id]}
+                for name, a in zip(PACKED_ATTRS, attrs):
+                    if a != NONE:
+                        node[name] = strings[a]
+                yield "node", node
+            elif tag == b"E":
+                src, dst, rel, risk = EDGE.unpack(f.read(EDGE.size))
+                edge = {"src": strings[src], "dst": strings[dst]}
+                if rel != NONE:
+                    edge["rel"] = strings[rel]
+                if risk != NONE:
+                    edge["risk"] = strings[risk]
+                yield "edge", edge
+            else:
+                raise ValueError(f"{path}: bad record tag {tag!r}")
+
+def write_packed_graph(path, records):
+    """Write ("node"/"edge", dict) records in the packed binary format"""
+    ids = {}
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(PACKED_MAGIC)
+
+        def sid(value):
+            if value is None:
+                return NONE
+            i = ids.get(value)
+            if i is None:
+                i = ids[value] = len(ids)
+                data = value.encode("utf-8")
+                f.write(b"S" + U32.pack(len(data)) + data)
+            return i
+
+        for kind, r in records:
+            if kind == "node":
+                attrs = [sid(r.get(name)) for name in PACKED_ATTRS]
+                f.write(b"N" + NODE.pack(sid(r["id"]), *attrs))
+            else:
+                f.write(b"E" + EDGE.pack(sid(r["src"]), sid(r["dst"]),
+                                         sid(r.get("rel")), sid(r.get("risk"))))
+    os.replace(tmp, path)
+
+def iter_graph_records(path):
+    """Pick a reader by file extension (.json, .jsonl, .pge)"""
+    ext = os.path.splitext(path)[1]
+    if ext == ".jsonl":
+        return iter_jsonl_graph(path)
+    if ext == ".pge":
+        return iter_packed_graph(path)
+    return iter_json_graph(path)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: graph_stream.py INPUT OUTPUT  (INPUT .json/.jsonl/.pge, OUTPUT .jsonl/.pge)",
+              file=sys.stderr)
+        sys.exit(2)
+
+    src_path, dst_path = sys.argv[1], sys.argv[2]
+    records = iter_graph_records(src_path)
+    if dst_path.endswith(".pge"):
+        write_packed_graph(dst_path, records)
+    else:
+        with open(dst_path, "w", encoding="utf-8") as out:
+            for _, r in records:
+                out.write(json.dumps(r) + "\n")
+    print(f"✅ Converted {src_path} → {dst_path}")
@@ -1,145 +1,481 @@
 #!/usr/bin/env python3
-import json, sys
-from collections import defaultdict, deque
+import argparse, heapq, json, multiprocessing, os, sys
+from array import array
 
-print("🔍 Zero Trust Attack Path Analyzer")
-print("==================================")
+from graph_index import RISK_WEIGHT, load_graph
 
-with open("labs/15-policy-graph/graph.json") as f:
-    G = json.load(f)
+# graph.json, a JSONL edge list or a packed .pge file (see graph_stream.py)
+GRAPH_PATH = os.environ.get("ZT_POLICY_GRAPH") or \
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "graph.json")
 
-# Build adjacency + node lookup
-adj = defaultdict(list)
-risk_edge = {}
-node_details = {}
+# Compiled CSR form of the graph, memory-mapped from graph.idx; loaded on
+# first use so importers can point it elsewhere (or assign it) beforehand
+graph = None
 
-for e in G["edges"]:
-    src, dst = e["src"], e["dst"]
-    adj[src].append(dst)
-    if "risk" in e:
-        risk_edge[(src,dst)] = e["risk"]
+def get_graph(path=None):
+    """The compiled graph: path if given, else whatever is loaded, else GRAPH_PATH"""
+    global graph
+    if path is not None:
+        graph = load_graph(path)
+    elif graph is None:
+        graph = load_graph(GRAPH_PATH)
+    return graph
 
-for n in G["nodes"]:
-    node_details[n["id"]] = n
+class PathTree:
+    """BFS discovery tree from one source, held in flat arrays.
 
-def bfs_paths(src, dst_max_types=("data","service"), max_depth=8):
-    paths = []
-    q = deque([ [src] ])
-    seen_depth = {src:0}
+    Entry i is node[i], reached from entry parent[i] (-1 for the source)
+    on a path of length[i] nodes carrying bonus[i] edge-risk points.
+    Every discovered path shares its prefix with its parent's, so nothing
+    is copied per step; targets lists the entries bfs_paths reports, in
+    its order, and paths are only built when asked for.
+    """
+
+    def __init__(self, source):
+        self.graph = graph = get_graph()
+        self.node = array("I", [source])
+        self.parent = array("i", [-1])
+        self.length = array("H", [1])
+        self.bonus = array("I", [0])
+        self.targets = array("I")
+        self.source_risk = graph.source_risk(source)
+
+    def path(self, i):
+        graph = self.graph
+        path = []
+        while i != -1:
+            path.append(graph.ids[self.node[i]])
+            i = self.parent[i]
+        path.reverse()
+        return path
+
+    def score(self, i):
+        """score_path() of entry i's path, without building it"""
+        base = max(1, 8 - self.length[i])
+        return (base + self.bonus[i]) * self.graph.tier_weight(self.node[i]) * self.source_risk
+
+def bfs_tree(src, dst_max_types=("data","service"), max_depth=8):
+    graph = get_graph()
+    s = graph.lookup(src)
+    if s is None:
+        return None
+    target_types = graph.codes_for("type", dst_max_types)
+    node_type = graph.attrs["type"]
+    offsets, targets, risk = graph.offsets, graph.targets, graph.risk
+    risk_weights = graph.risk_weights
+
+    tree = PathTree(s)
+    node, parent, length, bonus = tree.node, tree.parent, tree.length, tree.bonus
+    seen = {s}
     
-    while q:
-        path = q.popleft()
-        u = path[-1]
+    # The entry arrays double as the BFS queue
+    head = 0
+    while head < len(node):
+        i, u, n = head, node[head], length[head]
+        head += 1
         
-        if len(path) > max_depth: 
+        if n > max_depth: 
             continue
             
         # If endpoint is a target node type, collect
-        node_type = node_details.get(u,{}).get("type")
-        if node_type in dst_max_types and len(path) > 1:
-            paths.append(path)
+        if node_type[u] in target_types and n > 1:
+            tree.targets.append(i)
             
-        for v in adj.get(u,[]):
-            if seen_depth.get(v, 1e9) > len(path):
-                seen_depth[v] = len(path)
-                q.append(path + [v])
+        for e in range(offsets[u], offsets[u+1]):
+            v = targets[e]
+            if v not in seen:
+                seen.add(v)
+                node.append(v)
+                parent.append(i)
+                length.append(n + 1)
+                bonus.append(bonus[i] + risk_weights[risk[e]])
                 
-    return paths
+    return tree
+
+def bfs_paths(src, dst_max_types=("data","service"), max_depth=8):
+    tree = bfs_tree(src, dst_max_types, max_depth)
+    if tree is None:
+        return []
+    return [tree.path(i) for i in tree.targets]
 
 def score_path(path):
     """Calculate risk score for attack path"""
+    graph = get_graph()
+    ids = [graph.lookup(n) for n in path]
+
     # Base score by length (shorter = riskier)
     base = max(1, 8 - len(path))  # len 2 => 6 pts, len 3 => 5 pts...
     
     # Risk edges add weight
     bonus = 0
-    for i in range(len(path)-1):
-        risk_level = risk_edge.get((path[i], path[i+1]), "")
-        bonus += {"critical":5, "high":3, "med":2, "low":1}.get(risk_level, 0)
+    for u, v in zip(ids, ids[1:]):
+        e = graph.find_edge(u, v) if u is not None and v is not None else -1
+        if e >= 0:
+            bonus += graph.risk_weights[graph.risk[e]]
     
     # Target sensitivity
-    tail = node_details.get(path[-1],{})
-    tier = tail.get("tier","internal")
-    tier_weight = {"public":0, "internal":1, "confidential":3, "restricted":5}.get(tier, 1)
+    tier_weight = graph.tier_weight(ids[-1]) if ids[-1] is not None else 1
     
     # Source threat level
-    head = node_details.get(path[0],{})
-    source_risk = 1
-    if head.get("type") == "user" and "attacker" in head.get("id",""):
-        source_risk = 3
+    source_risk = graph.source_risk(ids[0]) if ids[0] is not None else 1
     
     return (base + bonus) * tier_weight * source_risk
 
-def explain_path(path):
-    """Generate human-readable path explanation"""
-    parts = []
-    total_risk = 0
-    
-    for i in range(len(path)-1):
-        edge_data = next((e for e in G["edges"] if e["src"]==path[i] and e["dst"]==path[i+1]), {})
-        rel = edge_data.get("rel", "?")
-        risk = edge_data.get("risk", "")
+def top_k_paths(src, k=10, dst_max_types=("data","service"), max_depth=8):
+    """Yield (score, path) for the k riskiest paths from src, best first.
+
+    Finds the same paths in the same order as sorting bfs_paths() by
+    score_path(), without enumerating them all: the BFS runs level by
+    level, tracking each node's parent and accumulated edge-risk bonus.
+    After every level the undiscovered paths are bounded by
+    (length base + bonus so far + max edge risk per remaining hop)
+    x max tier weight x source risk; queued candidates at or above that
+    bound are final and are yielded, and the search stops once k are out.
+    """
+    graph = get_graph()
+    s = graph.lookup(src)
+    if s is None or k <= 0:
+        return
+    target_types = graph.codes_for("type", dst_max_types)
+    node_type = graph.attrs["type"]
+    offsets, targets, risk = graph.offsets, graph.targets, graph.risk
+    risk_weights = graph.risk_weights
+
+    source_risk = graph.source_risk(s)
+    max_tier = max(graph.tier_weights)
+    max_risk = max(risk_weights)
+
+    parent = {s: -1}
+    bonus = {s: 0}
+    level = [s]
+    length = 1  # nodes per path at this level
+    candidates = []  # heap of (-score, discovery order, node)
+    found = yielded = 0
+
+    while yielded < k:
+        if level and length <= max_depth:
+            base = max(1, 8 - length)
+            nxt = []
+            for u in level:
+                if node_type[u] in target_types and length > 1:
+                    score = (base + bonus[u]) * graph.tier_weight(u) * source_risk
+                    heapq.heappush(candidates, (-score, found, u))
+                    found += 1
+                for i in range(offsets[u], offsets[u+1]):
+                    v = targets[i]
+                    if v not in parent:
+                        parent[v] = u
+                        bonus[v] = bonus[u] + risk_weights[risk[i]]
+                        nxt.append(v)
+            level = nxt
+            length += 1
+
+            # Only the best k - yielded candidates can still be reported
+            if len(candidates) > 2 * k:
+                candidates = heapq.nsmallest(k - yielded, candidates)
+        else:
+            level = []
+
+        if level and length <= max_depth:
+            hops_left = max_depth - length
+            bound = max(1, 8 - length) + max(bonus[v] for v in level) + max_risk * hops_left
+            bound *= max_tier * source_risk
+        else:
+            bound = None
+
+        # Ties go to earlier discoveries, so a score equal to the bound is final
+        while candidates and yielded < k and (bound is None or -candidates[0][0] >= bound):
+            neg_score, _, u = heapq.heappop(candidates)
+            path = []
+            while u != -1:
+                path.append(graph.ids[u])
+                u = parent[u]
+            path.reverse()
+            yielded += 1
+            yield -neg_score, path
+
+        if bound is None:
+            return
+
+def path_stats(src, dst_max_types=("data","service"), max_depth=8, bucket=5):
+    """Path count and score histogram for src without building any path.
+
+    bfs_paths keeps the first path that reaches each node, so a node's
+    depth and edge-risk bonus are fixed when it is discovered: the path
+    tree carries exactly that per-node state, and every score is read off
+    it.  Memory is bounded by the graph, not by the number of paths.
+    Histogram keys are score buckets of width `bucket`.
+    """
+    stats = {"paths": 0, "high": 0, "critical": 0, "max_score": 0, "histogram": {}}
+    tree = bfs_tree(src, dst_max_types, max_depth)
+    if tree is None:
+        return stats
+
+    histogram = {}
+    for i in tree.targets:
+        score = tree.score(i)
+        stats["high"] += score >= 15
+        stats["critical"] += score >= 25
+        stats["max_score"] = max(stats["max_score"], score)
+        key = score // bucket * bucket
+        histogram[key] = histogram.get(key, 0) + 1
+
+    stats["paths"] = len(tree.targets)
+    stats["histogram"] = dict(sorted(histogram.items()))
+    return stats
+
+def explain_paths(paths, fmt="text"):
+    """Explain many paths in one pass.
+
+    Hop and target lookups go through the (src, dst) edge index and are
+    cached across the batch, since paths from one source share prefixes.
+    fmt="text" gives explain_path()'s (explanation, edge risk) tuples;
+    fmt="json" gives dicts listing every edge of each hop (multi-edges
+    with different rel values included).
+    """
+    graph = get_graph()
+    hops = {}
+    tails = {}
+
+    def hop(a, b):
+        key = (a, b)
+        if key not in hops:
+            u, v = graph.lookup(a), graph.lookup(b)
+            entries = graph.edge_entries(u, v) if u is not None and v is not None else []
+            edges = [graph.edge_attrs(e) for e in entries]
+            # The first edge in graph.json order describes the hop
+            first = edges[0] if edges else {}
+            hops[key] = (first.get("rel") or "?", first.get("risk") or "", edges)
+        return hops[key]
+
+    def tail(name):
+        if name not in tails:
+            u = graph.lookup(name)
+            tails[name] = graph.node_info(u) if u is not None else {"id": name}
+        return tails[name]
+
+    explained = []
+    for path in paths:
+        parts = []
+        steps = []
+        total_risk = 0
         
-        risk_score = {"critical":5, "high":3, "med":2, "low":1}.get(risk, 0)
-        total_risk += risk_score
+        for a, b in zip(path, path[1:]):
+            rel, risk, edges = hop(a, b)
+            total_risk += RISK_WEIGHT.get(risk, 0)
+            if fmt == "json":
+                steps.append({"src": a, "dst": b, "rel": rel, "risk": risk or None,
+                              "edges": edges})
+            else:
+                risk_display = f" ⚠️{risk.upper()}" if risk else ""
+                parts.append(f"{a} --[{rel}{risk_display}]-->")
         
-        risk_display = f" ⚠️{risk.upper()}" if risk else ""
-        parts.append(f"{path[i]} --[{rel}{risk_display}]-->")
+        target = tail(path[-1])
+        if fmt == "json":
+            explained.append({"path": list(path), "hops": steps, "edge_risk": total_risk,
+                              "target": target})
+        else:
+            parts.append(path[-1])
+            # Add target sensitivity info
+            target_info = f" | Target: {target.get('tier') or 'unknown'} tier"
+            explained.append((" ".join(parts) + target_info, total_risk))
     
-    parts.append(path[-1])
-    explanation = " ".join(parts)
-    
-    # Add target sensitivity info
-    target = node_details.get(path[-1],{})
-    target_info = f" | Target: {target.get('tier','unknown')} tier"
-    
-    return explanation + target_info, total_risk
+    return explained
+
+def explain_path(path):
+    """Generate human-readable path explanation"""
+    return explain_paths([path])[0]
 
-def analyze_attack_paths(src_user="user:ola"):
+def analyze_attack_paths(src_user="user:ola", top_k=None):
     print(f"\n🎯 Analyzing attack paths from: {src_user}")
     print("=" * 60)
     
-    paths = bfs_paths(src_user)
+    if top_k:
+        # Best-first search: only the k riskiest paths are ever built
+        scored = list(top_k_paths(src_user, top_k))
+    else:
+        # Scores come straight off the path tree; paths are built only when reported
+        tree = bfs_tree(src_user)
+        scored = [(tree.score(i), i) for i in tree.targets] if tree else []
+        
+        # Sort by risk score (descending)
+        scored.sort(key=lambda x: -x[0])
     
-    if not paths:
+    if not scored:
         print("❌ No attack paths found from this source.")
         return
     
-    # Score and rank paths
-    ranked_paths = []
-    for path in paths:
-        score = score_path(path)
-        explanation, path_risk = explain_path(path)
-        ranked_paths.append((score, path, explanation, path_risk))
+    # Explain the reported paths in one batch
+    reported = [(score, entry if top_k else tree.path(entry)) for score, entry in scored[:top_k or 10]]
+    explained = explain_paths([path for _, path in reported])
+    ranked_paths = [(score, path, explanation, path_risk)
+                    for (score, path), (explanation, path_risk) in zip(reported, explained)]
     
-    # Sort by risk score (descending)
-    ranked_paths.sort(key=lambda x: -x[0])
+    if top_k:
+        print(f"🚨 Top {top_k} highest risk paths (top-k search):\n")
+    else:
+        print(f"📊 Found {len(scored)} potential attack paths")
+        print(f"🚨 Top 10 highest risk paths:\n")
     
-    print(f"📊 Found {len(ranked_paths)} potential attack paths")
-    print(f"🚨 Top 10 highest risk paths:\n")
-    
-    for i, (score, path, explanation, path_risk) in enumerate(ranked_paths[:10], 1):
+    graph = get_graph()
+    for i, (score, path, explanation, path_risk) in enumerate(ranked_paths, 1):
         print(f"{i:2d}. Risk Score: {score:>2} | Hops: {len(path)-1:>2}")
         print(f"    Path: {explanation}")
-        print(f"    Details: {node_details[path[0]]['type']} → {node_details[path[-1]]['type']}")
+        print(f"    Details: {graph.attr(graph.lookup(path[0]), 'type')} → {graph.attr(graph.lookup(path[-1]), 'type')}")
         print()
     
+    if top_k:
+        # Totals would need the full enumeration
+        return ranked_paths
+    
     # Summary statistics
-    high_risk_paths = [p for p in ranked_paths if p[0] >= 15]
-    critical_paths = [p for p in ranked_paths if p[0] >= 25]
+    high_risk = sum(1 for score, _ in scored if score >= 15)
+    critical = sum(1 for score, _ in scored if score >= 25)
     
     print("📈 RISK SUMMARY:")
-    print(f"   Total paths: {len(ranked_paths)}")
-    print(f"   High risk (≥15): {len(high_risk_paths)}")
-    print(f"   Critical risk (≥25): {len(critical_paths)}")
+    print(f"   Total paths: {len(scored)}")
+    print(f"   High risk (≥15): {high_risk}")
+    print(f"   Critical risk (≥25): {critical}")
     
     return ranked_paths
 
-if __name__ == "__main__":
-    source_user = sys.argv[1] if len(sys.argv) > 1 else "user:ola"
-    analyze_attack_paths(source_user)
+def report_path_stats(src_user="user:ola"):
+    print(f"\n🎯 Path statistics from: {src_user}")
+    print("=" * 60)
+    
+    stats = path_stats(src_user)
+    if not stats["paths"]:
+        print("❌ No attack paths found from this source.")
+        return stats
     
-    # Also analyze from attacker perspective
-    if source_user != "user:attacker":
-        print("\n" + "="*60)
-        analyze_attack_paths("user:attacker")
+    print("📈 RISK SUMMARY:")
+    print(f"   Total paths: {stats['paths']}")
+    print(f"   High risk (≥15): {stats['high']}")
+    print(f"   Critical risk (≥25): {stats['critical']}")
+    print(f"   Highest score: {stats['max_score']}")
+    print("📊 Score histogram:")
+    for low, count in stats["histogram"].items():
+        print(f"   {low:>3}-{low + 4:<3} {'█' * min(count, 50)} {count}")
+    
+    return stats
+
+def principals(types=("user","role")):
+    """All node ids of the given types, in graph order"""
+    graph = get_graph()
+    codes = graph.codes_for("type", types)
+    node_type = graph.attrs["type"]
+    return [graph.ids[u] for u in range(graph.num_nodes) if node_type[u] in codes]
+
+def sweep_source(src, k=10):
+    """Summary of one principal's attack paths; runs inside sweep workers"""
+    stats = path_stats(src)
+    return {
+        "source": src,
+        "paths": stats["paths"],
+        "high": stats["high"],
+        "critical": stats["critical"],
+        "top": list(top_k_paths(src, k)),
+    }
+
+def path_report(src, k=10):
+    """sweep_source() summary with the top paths explained as JSON-ready dicts"""
+    report = sweep_source(src, k)
+    explained = explain_paths([path for _, path in report["top"]], fmt="json")
+    report["top"] = [{"score": score, **e} for (score, _), e in zip(report["top"], explained)]
+    return report
+
+def sweep_all_principals(workers=None, k=10):
+    """Analyze every user/role node across a process pool.
+
+    Workers read the same memory-mapped graph.idx (inherited on fork,
+    re-mapped on spawn), so the graph is loaded once into the page cache
+    rather than once per process.  Returns per-source summaries in graph
+    order plus the k riskiest paths across all of them.
+    """
+    sources = principals()
+    get_graph().index  # load the graph and build the id lookup once before forking
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(sources) // (workers * 16))
+
+    if workers == 1:
+        results = [sweep_source(src, k) for src in sources]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.starmap(sweep_source, [(src, k) for src in sources], chunksize)
+
+    merged = [(score, path) for r in results for score, path in r["top"]]
+    merged.sort(key=lambda x: -x[0])
+    return results, merged[:k]
+
+def report_sweep(workers=None, k=10):
+    print("\n🌐 Sweeping attack paths from all principals")
+    print("=" * 60)
+    
+    results, top = sweep_all_principals(workers, k)
+    
+    total = sum(r["paths"] for r in results)
+    print(f"📊 {len(results)} principals, {total} potential attack paths")
+    print(f"🚨 Top {k} highest risk paths across all principals:\n")
+    
+    explained = explain_paths([path for _, path in top])
+    for i, ((score, path), (explanation, _)) in enumerate(zip(top, explained), 1):
+        print(f"{i:2d}. Risk Score: {score:>2} | Hops: {len(path)-1:>2} | Source: {path[0]}")
+        print(f"    Path: {explanation}")
+        print()
+    
+    # Blast radius: principals ranked by their worst path, then path count
+    exposed = [r for r in results if r["paths"]]
+    exposed.sort(key=lambda r: (-r["top"][0][0], -r["paths"]))
+    
+    print("📈 BLAST RADIUS BY PRINCIPAL:")
+    for r in exposed[:k]:
+        print(f"   {r['source']}: max {r['top'][0][0]} | paths {r['paths']} | "
+              f"high {r['high']} | critical {r['critical']}")
+    print(f"   High risk (≥15): {sum(r['high'] for r in results)}")
+    print(f"   Critical risk (≥25): {sum(r['critical'] for r in results)}")
+    
+    return results, top
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Zero Trust attack path analyzer")
+    parser.add_argument("source", nargs="?", default="user:ola", help="source node id")
+    parser.add_argument("--graph", help="graph file (.json, .jsonl or .pge)")
+    parser.add_argument("--top-k", type=int, metavar="K",
+                        help="report only the K riskiest paths via best-first search")
+    parser.add_argument("--aggregate", action="store_true",
+                        help="print path counts and score histograms without enumerating paths")
+    parser.add_argument("--sweep", action="store_true",
+                        help="analyze every user/role node in parallel and merge the results")
+    parser.add_argument("--workers", type=int, help="sweep worker processes (default: all cores)")
+    parser.add_argument("--json", action="store_true",
+                        help="print a JSON report of the top paths instead of text")
+    args = parser.parse_args()
+
+    if args.graph:
+        # Exported so spawned sweep workers load the same graph
+        os.environ["ZT_POLICY_GRAPH"] = args.graph
+        get_graph(args.graph)
+
+    sources = [args.source] + (["user:attacker"] if args.source != "user:attacker" else [])
+    if args.json:
+        reports = [path_report(src, args.top_k or 10) for src in sources]
+        print(json.dumps({"reports": reports}, indent=2))
+        sys.exit(0)
+
+    print("🔍 Zero Trust Attack Path Analyzer")
+    print("==================================")
+
+    if args.sweep:
+        report_sweep(args.workers, args.top_k or 10)
+    elif args.aggregate:
+        report_path_stats(args.source)
+        if args.source != "user:attacker":
+            report_path_stats("user:attacker")
+    else:
+        source_user = args.source
+        analyze_attack_paths(source_user, args.top_k)
+        
+        # Also analyze from attacker perspective
+        if source_user != "user:attacker":
+            print("\n" + "="*60)
+            analyze_attack_paths("user:attacker", args.top_k)
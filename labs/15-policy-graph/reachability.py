@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Lesson 15: Reachability Index
+Precomputed "can X reach Y" answers over the compiled policy graph
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from graph_index import align8, load_graph
+
+MAGIC = b"ZTPGRCH1"
+# magic, byte order, nodes, components, targets, bytes per bitset, source size,
+# source mtime_ns, target spec length
+HEADER = struct.Struct("<8sc7xQQQQQqQ")
+
+def strongly_connected_components(graph):
+    """Iterative Tarjan over the CSR arrays.
+
+    Returns (comp, ncomp): comp[u] is u's component and components are
+    numbered in the order Tarjan closes them, i.e. every edge between
+    components goes from a higher number to a lower one.
+    """
+    n = graph.num_nodes
+    offsets, targets = graph.offsets, graph.targets
+    index = array("l", [-1]) * n
+    low = array("l", [0]) * n
+    comp = array("l", [-1]) * n
+    on_stack = bytearray(n)
+    stack = []
+    counter = ncomp = 0
+
+    for root in range(n):
+        if index[root] != -1:
+            continue
+        work = [(root, offsets[root])]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        while work:
+            u, i = work[-1]
+            if i < offsets[u + 1]:
+                work[-1] = (u, i + 1)
+                v = targets[i]
+                if index[v] == -1:
+                    index[v] = low[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack[v] = 1
+                    work.append((v, offsets[v]))
+                elif on_stack[v] and index[v] < low[u]:
+                    low[u] = index[v]
+                continue
+            work.pop()
+            if work and low[u] < low[work[-1][0]]:
+                low[work[-1][0]] = low[u]
+            if low[u] == index[u]:
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = 0
+                    comp[w] = ncomp
+                    if w == u:
+                        break
+                ncomp += 1
+    return comp, ncomp
+
+def build_reachability(graph, target_types=("data","service")):
+    """Bitset over the target nodes reachable (in >= 1 hop) from each component"""
+    codes = graph.codes_for("type", target_types)
+    node_type = graph.attrs["type"]
+    target_nodes = [u for u in range(graph.num_nodes) if node_type[u] in codes]
+    bit = {u: b for b, u in enumerate(target_nodes)}
+
+    comp, ncomp = strongly_connected_components(graph)
+    own = [0] * ncomp      # targets inside the component
+    cyclic = [False] * ncomp
+    succ = [set() for _ in range(ncomp)]
+    for u in range(graph.num_nodes):
+        c = comp[u]
+        if u in bit:
+            own[c] |= 1 << bit[u]
+        for i in range(graph.offsets[u], graph.offsets[u + 1]):
+            d = comp[graph.targets[i]]
+            if d == c:
+                cyclic[c] = True  # a cycle, or a self-loop
+            else:
+                succ[c].add(d)
+
+    # Successors always have lower numbers, so one ascending pass suffices
+    reach = [0] * ncomp
+    for c in range(ncomp):
+        bits = own[c] if cyclic[c] else 0
+        for d in succ[c]:
+            bits |= own[d] | reach[d]
+        reach[c] = bits
+    return comp, target_nodes, reach
+
+def reach_path_for(json_path):
+    return os.path.splitext(json_path)[0] + ".reach"
+
+def save_reachability(path, graph, comp, target_nodes, reach, target_types, source_stat):
+    width = (len(target_nodes) + 7) // 8
+    spec = json.dumps(list(target_types)).encode()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, sys.byteorder[0].encode(), graph.num_nodes, len(reach),
+                            len(target_nodes), width, source_stat.st_size,
+                            source_stat.st_mtime_ns, len(spec)))
+        f.write(spec + b"\0" * (align8(len(spec)) - len(spec)))
+        f.write(array("I", comp).tobytes())
+        f.write(array("I", target_nodes).tobytes())
+        for bits in reach:
+            f.write(bits.to_bytes(width, "little"))
+    os.replace(tmp, path)
+
+class ReachabilityIndex:
+    """Memory-mapped reachability bitsets; see load_reachability()"""
+
+    def __init__(self, graph, mm, width, comp, target_nodes, bitsets_at):
+        self.graph = graph
+        self._mm = mm
+        self.width = width
+        self.comp = comp
+        self.target_nodes = target_nodes
+        self._bitsets_at = bitsets_at
+        self._bit = None
+
+    @property
+    def bit(self):
+        """Target node -> bit position (built on first use)"""
+        if self._bit is None:
+            self._bit = {u: b for b, u in enumerate(self.target_nodes)}
+        return self._bit
+
+    def _start(self, u):
+        return self._bitsets_at + self.comp[u] * self.width
+
+    def can_reach(self, src, dst):
+        """True if dst (a target node) is reachable from src in one or more hops"""
+        u, v = self.graph.lookup(src), self.graph.lookup(dst)
+        if u is None or v is None or v not in self.bit:
+            return False
+        b = self.bit[v]
+        return bool(self._mm[self._start(u) + (b >> 3)] & (1 << (b & 7)))
+
+    def reachable_bits(self, src):
+        u = self.graph.lookup(src)
+        if u is None:
+            return 0
+        start = self._start(u)
+        return int.from_bytes(self._mm[start:start + self.width], "little")
+
+    def reachable_targets(self, src):
+        """Ids of all target nodes reachable from src"""
+        bits = self.reachable_bits(src)
+        ids = self.graph.ids
+        found = []
+        while bits:
+            low = bits & -bits
+            found.append(ids[self.target_nodes[low.bit_length() - 1]])
+            bits ^= low
+        return found
+
+    def mask(self, attr, values):
+        """Bitset of targets whose attribute is in values, e.g. ("tier", {"restricted"})"""
+        codes = self.graph.codes_for(attr, values)
+        col = self.graph.attrs[attr]
+        bits = 0
+        for b, u in enumerate(self.target_nodes):
+            if col[u] in codes:
+                bits |= 1 << b
+        return bits
+
+    def can_reach_any(self, src, mask):
+        return bool(self.reachable_bits(src) & mask)
+
+def open_reachability(path, graph, target_types, source_stat):
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            return None
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, order, n, ncomp, ntargets, width, size, mtime, slen = HEADER.unpack_from(mm, 0)
+    if magic != MAGIC or order != sys.byteorder[0].encode():
+        return None
+    if (size, mtime) != (source_stat.st_size, source_stat.st_mtime_ns) or n != graph.num_nodes:
+        return None
+    pos = HEADER.size
+    if json.loads(mm[pos:pos + slen]) != list(target_types):
+        return None
+    pos += align8(slen)
+
+    view = memoryview(mm)
+    comp = view[pos:pos + 4 * n].cast("I")
+    pos += 4 * n
+    target_nodes = view[pos:pos + 4 * ntargets].cast("I")
+    pos += 4 * ntargets
+    return ReachabilityIndex(graph, mm, width, comp, target_nodes, pos)
+
+def load_reachability(json_path, target_types=("data","service"), graph=None):
+    """Load graph.reach next to graph.json, rebuilding it if graph.json changed"""
+    graph = graph or load_graph(json_path)
+    path = reach_path_for(json_path)
+    st = os.stat(json_path)
+    index = open_reachability(path, graph, target_types, st)
+    if index is None:
+        comp, target_nodes, reach = build_reachability(graph, target_types)
+        save_reachability(path, graph, comp, target_nodes, reach, target_types, st)
+        index = open_reachability(path, graph, target_types, st)
+    return index
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: reachability.py SOURCE [TARGET | --tier TIER]", file=sys.stderr)
+        sys.exit(2)
+
+    json_path = "labs/15-policy-graph/graph.json"
+    index = load_reachability(json_path)
+    src = sys.argv[1]
+
+    # Exit status 0 = reachable, 1 = not reachable (for shell pre-checks)
+    if len(sys.argv) > 3 and sys.argv[2] == "--tier":
+        reachable = index.can_reach_any(src, index.mask("tier", {sys.argv[3]}))
+        print(f"{src} → {sys.argv[3]} tier: {'REACHABLE' if reachable else 'unreachable'}")
+    elif len(sys.argv) > 2:
+        reachable = index.can_reach(src, sys.argv[2])
+        print(f"{src} → {sys.argv[2]}: {'REACHABLE' if reachable else 'unreachable'}")
+    else:
+        found = index.reachable_targets(src)
+        reachable = bool(found)
+        print(f"🎯 {src} reaches {len(found)} targets")
+        for target in found:
+            print(f"   {target}")
+    sys.exit(0 if reachable else 1)
@@ -5,28 +5,46 @@ echo "🔒 Policy Graph SOAR Integration"
 echo "================================"
 
 RISK_THRESHOLD="${1:-20}"
+# Start it with: python3 labs/15-policy-graph/graph_service.py &
+SERVICE_URL="${ZT_GRAPH_SERVICE:-http://127.0.0.1:8765}"
+ANALYSIS=/tmp/graph_analysis.json
 
-# Analyze attack paths
-python3 labs/15-policy-graph/pathfinder.py > /tmp/graph_analysis.txt
+# Fast pre-check against the precomputed reachability index (graph.reach)
+if REACH=$(curl -sf "$SERVICE_URL/reach?src=user:attacker&tier=restricted"); then
+    REACHABLE=$(jq -r '.reachable' <<< "$REACH")
+elif python3 labs/15-policy-graph/reachability.py user:attacker --tier restricted > /dev/null; then
+    REACHABLE=true
+else
+    REACHABLE=false
+fi
+if [[ "$REACHABLE" == "true" ]]; then
+    echo "⚠️  user:attacker can reach restricted-tier resources"
+fi
 
-# Extract highest risk score
-HIGHEST_RISK=$(grep "Risk Score:" /tmp/graph_analysis.txt | head -1 | awk '{print $3}')
+# Analyze attack paths: ask the running service, or fall back to a one-off process
+if ! curl -sf "$SERVICE_URL/paths?src=user:ola&src=user:attacker&k=1" > "$ANALYSIS"; then
+    python3 labs/15-policy-graph/pathfinder.py user:ola --json --top-k 1 > "$ANALYSIS"
+fi
 
-if [[ -n "$HIGHEST_RISK" && "$HIGHEST_RISK" -ge "$RISK_THRESHOLD" ]]; then
+# Highest risk score across all analyzed sources
+HIGHEST_RISK=$(jq '[.reports[].top[0].score // 0] | max // 0' "$ANALYSIS")
+
+if [[ "$HIGHEST_RISK" -ge "$RISK_THRESHOLD" ]]; then
     echo "🚨 CRITICAL: Attack path detected with risk score $HIGHEST_RISK (threshold: $RISK_THRESHOLD)"
     echo "📋 Top attack path:"
-    grep -A 2 "1\. Risk Score:" /tmp/graph_analysis.txt | head -3
-    
+    jq -r '[.reports[].top[0] | select(.)] | max_by(.score)
+           | " 1. Risk Score: \(.score) | Hops: \(.path | length - 1)\n    Path: \(.path | join(" → ")) | Target: \(.target.tier // "unknown") tier"' "$ANALYSIS"
+
     # Trigger SOAR response
     echo '{"mode":"restricted"}' > labs/11-soar-integration/policy_state.json
     echo "✅ SOAR Response: Policy set to RESTRICTED mode"
-    
+
     # Log the event
     echo "$(date -Is) - Graph analysis triggered restricted mode (risk: $HIGHEST_RISK)" >> labs/15-policy-graph/soar_actions.log
 else
-    echo "✅ No critical attack paths detected (highest risk: ${HIGHEST_RISK:-0})"
+    echo "✅ No critical attack paths detected (highest risk: $HIGHEST_RISK)"
     echo '{"mode":"normal"}' > labs/11-soar-integration/policy_state.json
 fi
 
 echo ""
-echo "📊 Analysis saved to: /tmp/graph_analysis.txt"
+echo "📊 Analysis saved to: $ANALYSIS"
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
-import json
+import argparse, contextlib, hashlib, json, os, re, shutil, sys
 
-print("🔗 Generating Policy Graph Visualization")
-G = json.load(open("labs/15-policy-graph/graph.json"))
+from graph_index import load_graph
+from graph_stream import iter_graph_records
+
+# Bump to invalidate every cached diagram (see cached_render)
+CACHE_VERSION = 1
 
 def get_node_style(node):
     """Get Mermaid styling based on node type and sensitivity"""
@@ -26,41 +29,35 @@ def get_node_style(node):
     
     return style_class
 
-print("flowchart TB")
-print("")
+def edge_arrow(risk_level):
+    return {
+        "low": "---",
+        "med": "-.->",
+        "high": "==>",
+        "critical": "==>>"
+    }.get(risk_level, "-->")
 
-# Print nodes with styling
-for n in G["nodes"]:
+def print_node(n):
     label = n["id"].replace(":", "\\n")
     style_class = get_node_style(n)
     print(f'  {n["id"].replace(":", "_")}["{label}"]')
     print(f'  class {n["id"].replace(":", "_")} {style_class};')
 
-print("")
-
-# Print edges with risk styling
-for e in G["edges"]:
+def print_edge(e):
     src_id = e["src"].replace(":", "_")
     dst_id = e["dst"].replace(":", "_")
-    rel = e["rel"]
-    
+
     if "risk" in e:
         risk_level = e["risk"]
-        line_style = {
-            "low": "---",
-            "med": "-.->",
-            "high": "==>",
-            "critical": "==>>"
-        }.get(risk_level, "-->")
-        
+        line_style = edge_arrow(risk_level)
+
         print(f'  {src_id} {line_style} |{risk_level.upper()}| {dst_id};')
     else:
         print(f'  {src_id} --> {dst_id};')
 
-print("")
-
-# Define comprehensive styling
-print("""
+def print_styles():
+    # Define comprehensive styling
+    print("""
 classDef U fill:#e6f3ff,stroke:#6cb0f5,stroke-width:2px;
 classDef R fill:#eef7ff,stroke:#4d94ff,stroke-width:2px;
 classDef POL fill:#f0fff0,stroke:#66cc66,stroke-width:2px;
@@ -78,7 +75,7 @@ classDef DATA_RISKY fill:#ffebee,stroke:#f44336,stroke-width:3px;
 classDef DEFAULT fill:#f5f5f5,stroke:#666,stroke-width:1px;
 """)
 
-print("""
+    print("""
 %% Graph Legend
 subgraph LEGEND[Graph Legend]
   direction LR
@@ -90,3 +87,217 @@ subgraph LEGEND[Graph Legend]
   L6[Data]:::DATA
 end
 """)
+
+# --- node selection (compiled graph) ---------------------------------
+
+def k_hop_nodes(graph, center, hops):
+    """Nodes within `hops` edges of center, following edges both ways"""
+    u = graph.lookup(center)
+    if u is None:
+        raise SystemExit(f"❌ Unknown node: {center}")
+    seen = {u}
+    level = [u]
+    for _ in range(hops):
+        nxt = []
+        for a in level:
+            for adjacent in (graph.neighbors(a), graph.predecessors(a)):
+                for b in adjacent:
+                    if b not in seen:
+                        seen.add(b)
+                        nxt.append(b)
+        level = nxt
+    return seen
+
+def top_path_edges(graph, k, sources=None):
+    """(src, dst) pairs on the k riskiest paths from sources (default: all users and roles)"""
+    import pathfinder
+    pathfinder.graph = graph
+
+    ranked = []
+    for src in sources or pathfinder.principals():
+        ranked.extend(pathfinder.top_k_paths(src, k))
+    ranked.sort(key=lambda x: -x[0])
+    pairs = set()
+    for _, path in ranked[:k]:
+        ids = [graph.lookup(n) for n in path]
+        pairs.update(zip(ids, ids[1:]))
+    return pairs
+
+def subgraph_edges(graph, nodes=None, pairs=None):
+    """CSR entries between the selected nodes, or on the selected (src, dst) pairs"""
+    if pairs is not None:
+        for u, v in sorted(pairs):
+            yield from ((u, i) for i in graph.edge_entries(u, v))
+        return
+    for u in sorted(nodes):
+        for i in range(graph.offsets[u], graph.offsets[u + 1]):
+            if graph.targets[i] in nodes:
+                yield u, i
+
+def edge_record(graph, u, i):
+    e = {"src": graph.ids[u], "dst": graph.ids[graph.targets[i]]}
+    attrs = graph.edge_attrs(i)
+    e["rel"] = attrs["rel"]
+    if attrs["risk"] is not None:
+        e["risk"] = attrs["risk"]
+    return e
+
+# --- rendering ---------------------------------------------------------
+
+def render_records(records):
+    """Plain diagram from ("node"/"edge", dict) records, streamed as they come"""
+    print("flowchart TB")
+    print("")
+
+    # Stream nodes and edges with styling, one record at a time
+    kind = "node"
+    for record_kind, record in records:
+        if record_kind != kind:
+            print("")
+            kind = record_kind
+        if kind == "node":
+            print_node(record)
+        else:
+            print_edge(record)
+
+    print("")
+    print_styles()
+
+def subgraph_records(graph, nodes, edges):
+    for u in sorted(nodes):
+        yield "node", graph.node_info(u)
+    for u, i in edges:
+        yield "edge", edge_record(graph, u, i)
+
+def cluster_id(attr, value):
+    return f"{attr}_{re.sub(r'[^A-Za-z0-9_]', '_', value or 'unknown')}"
+
+def render_clusters(graph, attr, nodes=None, edges=None):
+    """One Mermaid node per attribute value, edges aggregated per pair of groups"""
+    codes = graph.attrs[attr]
+    values = graph.tables[attr]
+    nodes = range(graph.num_nodes) if nodes is None else sorted(nodes)
+    if edges is None:
+        edges = ((u, i) for u in nodes for i in range(graph.offsets[u], graph.offsets[u + 1]))
+
+    members = {}
+    for u in nodes:
+        members[codes[u]] = members.get(codes[u], 0) + 1
+
+    # (src group, dst group) -> [edge count, worst risk]
+    # Each edge's own risk, as edge_record shows it, not the pair risk the scorer uses
+    risk_weights = graph.risk_weights
+    edge_risk = graph.edge_risk
+    links = {}
+    for u, i in edges:
+        key = (codes[u], codes[graph.targets[i]])
+        link = links.setdefault(key, [0, 0])
+        link[0] += 1
+        if risk_weights[edge_risk[i]] > risk_weights[link[1]]:
+            link[1] = edge_risk[i]
+
+    print("flowchart TB")
+    print("")
+    for code, count in sorted(members.items(), key=lambda x: (not x[0], values[x[0]] or "")):
+        value = values[code] or "unknown"
+        style = get_node_style({"type": value}) if attr == "type" else "DEFAULT"
+        label = f"{count} nodes" if count != 1 else "1 node"
+        print(f'  {cluster_id(attr, value)}["{attr}: {value}\\n{label}"]')
+        print(f'  class {cluster_id(attr, value)} {style};')
+    print("")
+    for (a, b), (count, risk) in sorted(links.items()):
+        label = f"{count} edges" if count != 1 else "1 edge"
+        risk_level = graph.tables["risk"][risk]
+        if risk_level:
+            label += f", max {risk_level.upper()}"
+        print(f'  {cluster_id(attr, values[a])} {edge_arrow(risk_level)} |{label}| '
+              f'{cluster_id(attr, values[b])};')
+    print("")
+    print_styles()
+
+def render(args):
+    if not (args.cluster or args.around or args.top_paths):
+        print("🔗 Generating Policy Graph Visualization")
+        render_records(iter_graph_records(args.graph))
+        return
+
+    graph = load_graph(args.graph)
+    nodes = edges = None
+    if args.around:
+        nodes = k_hop_nodes(graph, args.around, args.hops)
+        edges = list(subgraph_edges(graph, nodes=nodes))
+    elif args.top_paths:
+        pairs = top_path_edges(graph, args.top_paths, args.source)
+        nodes = {u for pair in pairs for u in pair}
+        edges = list(subgraph_edges(graph, pairs=pairs))
+
+    if args.cluster:
+        render_clusters(graph, args.cluster, nodes, edges)
+    else:
+        render_records(subgraph_records(graph, nodes, edges))
+
+# --- cache -------------------------------------------------------------
+
+class Tee:
+    def __init__(self, *streams):
+        self.streams = streams
+
+    def write(self, data):
+        for s in self.streams:
+            s.write(data)
+
+    def flush(self):
+        for s in self.streams:
+            s.flush()
+
+def cache_path_for(args):
+    """One file per rendering mode, next to the graph"""
+    mode = {k: v for k, v in vars(args).items() if k not in ("graph", "no_cache")}
+    key = hashlib.sha1(json.dumps(mode, sort_keys=True).encode()).hexdigest()[:16]
+    return f"{os.path.splitext(args.graph)[0]}.mmd-cache/{key}.mmd"
+
+def cached_render(args):
+    """Replay the cached diagram if the graph is unchanged, else render and cache it"""
+    st = os.stat(args.graph)
+    stamp = f"%% source {CACHE_VERSION} {st.st_size} {st.st_mtime_ns}\n"
+    path = cache_path_for(args)
+    try:
+        with open(path, encoding="utf-8") as f:
+            if f.readline() == stamp:
+                shutil.copyfileobj(f, sys.stdout)
+                return
+    except FileNotFoundError:
+        pass
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(stamp)
+            with contextlib.redirect_stdout(Tee(sys.stdout, f)):
+                render(args)
+    except BaseException:
+        os.remove(tmp)  # never leave a partial diagram behind
+        raise
+    os.replace(tmp, path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the policy graph as a Mermaid flowchart")
+    parser.add_argument("graph", nargs="?", default="labs/15-policy-graph/graph.json",
+                        help="graph file (.json, .jsonl or .pge)")
+    parser.add_argument("--cluster", choices=("type", "department", "tier"),
+                        help="collapse nodes into one box per value, with edge counts")
+    subset = parser.add_mutually_exclusive_group()
+    subset.add_argument("--around", metavar="NODE", help="only the k-hop neighbourhood of NODE")
+    parser.add_argument("--hops", type=int, default=2, help="neighbourhood radius for --around")
+    subset.add_argument("--top-paths", type=int, metavar="K",
+                        help="only the edges on the K riskiest attack paths")
+    parser.add_argument("--source", action="append",
+                        help="source for --top-paths (repeatable, default: all users and roles)")
+    parser.add_argument("--no-cache", action="store_true", help="always re-render")
+    args = parser.parse_args()
+
+    if args.no_cache:
+        render(args)
+    else:
+        cached_render(args)
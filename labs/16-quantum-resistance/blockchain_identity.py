@@ -7,11 +7,60 @@ Decentralized identity management for Zero Trust
 import hashlib
 import json
 import time
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timezone
 import secrets
+import multiprocessing
+import os
+import struct
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait as wait_futures
+
+# Mined header: version, index, timestamp (µs since epoch), previous hash,
+# Merkle root of the transactions, nonce -- 92 bytes, nonce last
+BLOCK_VERSION = 3
+HEADER = struct.Struct(">IQq32s32sQ")
+NONCE = struct.Struct(">Q")
+NONCE_OFFSET = HEADER.size - NONCE.size
+
+LEAF, NODE = b"\x00", b"\x01"  # domain separation: a leaf hash can never pass as an inner node
+
+def merkle_root(transactions):
+    """SHA-256 Merkle root over canonical JSON of each transaction
+    
+    An odd node is promoted to the next level unchanged rather than
+    paired with a copy of itself; duplicating it would let [a, b, c] and
+    [a, b, c, c] share a root (CVE-2012-2459).
+    """
+    if not isinstance(transactions, list):
+        transactions = [transactions]  # the genesis block carries a single dict
+    level = [hashlib.sha256(LEAF + json.dumps(t, sort_keys=True).encode()).digest()
+             for t in transactions]
+    if not level:
+        return hashlib.sha256(LEAF).digest()
+    while len(level) > 1:
+        paired = [hashlib.sha256(NODE + level[i] + level[i + 1]).digest()
+                  for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0]
+
+def difficulty_target(difficulty):
+    """Digests below this have difficulty leading zero hex digits"""
+    if difficulty <= 0:
+        return b"\xff" * 33  # longer than any digest, so every digest qualifies
+    return (1 << (256 - 4 * difficulty)).to_bytes(32, "big")
 
 class Block:
-    """Basic blockchain block for identity management"""
+    """Basic blockchain block for identity management
+    
+    The hash covers a fixed 92-byte header rather than the whole block:
+    transactions are committed through their Merkle root, so the cost of
+    one mining attempt does not depend on how many transactions the block
+    holds, and the nonce can be patched into the serialized header in
+    place.
+    """
     
     def __init__(self, index, timestamp, data, previous_hash):
         self.index = index
@@ -20,17 +69,220 @@ class Block:
         self.previous_hash = previous_hash
         self.nonce = 0  # Add nonce for mining
         self.hash = self.calculate_hash()
+    
+    def header(self):
+        """Serialized header as a mutable buffer (Merkle root recomputed from data)"""
+        return bytearray(HEADER.pack(
+            BLOCK_VERSION,
+            self.index,
+            round(_epoch(self.timestamp) * 1_000_000),
+            bytes.fromhex(self.previous_hash.rjust(64, "0")),  # genesis links to "0"
+            merkle_root(self.data),
+            self.nonce
+        ))
         
     def calculate_hash(self):
         """Calculate block hash"""
-        block_string = json.dumps({
-            "index": self.index,
-            "timestamp": self.timestamp,
-            "data": self.data,
-            "previous_hash": self.previous_hash,  # FIXED: was self.public_key
-            "nonce": self.nonce
-        }, sort_keys=True)
-        return hashlib.sha256(block_string.encode()).hexdigest()
+        return hashlib.sha256(self.header()).hexdigest()
+
+class Miner:
+    """Single-process proof-of-work: try nonces 0, 1, 2, ... until the hash qualifies
+    
+    stats accumulates blocks, hashes and seconds, and keeps the last
+    block's hashes_per_second and time_to_seal.
+    """
+    
+    def __init__(self):
+        self.stats = {"blocks": 0, "hashes": 0, "seconds": 0.0,
+                      "hashes_per_second": 0.0, "time_to_seal": 0.0}
+    
+    def _record(self, hashes, seconds, time_to_seal=None):
+        self.stats["blocks"] += 1
+        self.stats["hashes"] += hashes
+        self.stats["seconds"] += seconds
+        self.stats["hashes_per_second"] = hashes / seconds if seconds else 0.0
+        self.stats["time_to_seal"] = seconds if time_to_seal is None else time_to_seal
+    
+    def mine(self, block, difficulty):
+        """Set block.nonce and block.hash to a hash with difficulty leading zeros"""
+        start = time.perf_counter()
+        header = block.header()
+        target = difficulty_target(difficulty)
+        nonce = block.nonce
+        hashes = 0
+        while True:
+            NONCE.pack_into(header, NONCE_OFFSET, nonce)
+            digest = hashlib.sha256(header).digest()
+            hashes += 1
+            if digest < target:
+                break
+            nonce += 1
+        block.nonce, block.hash = nonce, digest.hex()
+        self._record(hashes, time.perf_counter() - start)
+        return block
+
+_cancel = None  # multiprocessing.Event shared with ParallelMiner workers
+CANCEL_CHECK = 1024  # nonces tried between checks of the cancel flag
+
+def _init_miner(cancel):
+    global _cancel
+    _cancel = cancel
+
+def _search_lane(header, difficulty, first, step):
+    """Try nonces first, first + step, ... until one qualifies or another lane wins"""
+    header = bytearray(header)
+    target = difficulty_target(difficulty)
+    sha256 = hashlib.sha256
+    nonce = first
+    hashes = 0
+    while True:
+        for _ in range(CANCEL_CHECK):
+            NONCE.pack_into(header, NONCE_OFFSET, nonce)
+            digest = sha256(header).digest()
+            hashes += 1
+            if digest < target:
+                _cancel.set()
+                return nonce, digest.hex(), hashes
+            nonce += step
+        if _cancel.is_set():
+            return None, None, hashes
+
+class ParallelMiner(Miner):
+    """Proof-of-work with the nonce space split across a process pool
+    
+    Worker i tries nonces i, i + workers, i + 2 * workers, ...; the first
+    to find a qualifying hash raises a shared flag and the others stop
+    within CANCEL_CHECK attempts. Any qualifying nonce is accepted, so it
+    need not be the smallest one. The pool is created on first use and
+    kept until close().
+    """
+    
+    def __init__(self, workers=None):
+        super().__init__()
+        self.workers = workers or os.cpu_count() or 1
+        self._cancel = multiprocessing.Event()
+        self._pool = None
+    
+    def mine(self, block, difficulty):
+        start = time.perf_counter()
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers, initializer=_init_miner,
+                                             initargs=(self._cancel,))
+        self._cancel.clear()
+        header = bytes(block.header())  # only the 92-byte header crosses to the workers
+        lanes = [self._pool.submit(_search_lane, header, difficulty, i, self.workers)
+                 for i in range(self.workers)]
+        wait_futures(lanes, return_when=FIRST_COMPLETED)
+        sealed = time.perf_counter() - start
+        # Losing lanes return once they see the flag; wait so the next block starts clean
+        results = [lane.result() for lane in lanes]
+        nonce, digest = next((n, d) for n, d, _ in results if n is not None)
+        block.nonce, block.hash = nonce, digest
+        self._record(sum(h for _, _, h in results), time.perf_counter() - start, sealed)
+        return block
+    
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+AUDIT_RANGE = 2000  # blocks per worker task in a full audit
+
+def first_invalid_block(blocks, previous_hash):
+    """Index of the first block whose hash or link to previous_hash is wrong, or None"""
+    for block in blocks:
+        if block.hash != block.calculate_hash() or block.previous_hash != previous_hash:
+            return block.index
+        previous_hash = block.hash
+    return None
+
+def _epoch(value):
+    """Seconds since the epoch for an ISO timestamp, datetime or number"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+class IdentityIndex:
+    """Identity state materialized from the chain, updated block by block
+    
+    state maps user_id to the current key hash and status: REGISTER and
+    VERIFY make a key ACTIVE, REVOKE of that key makes it REVOKED, applied
+    in chain order. history keeps each user's transactions sorted by
+    timestamp (ties in chain order), with the parsed times alongside for
+    range queries; a transaction mined after a later-stamped one is
+    inserted in its place rather than appended. Lookups cost the same
+    however long the chain is.
+    """
+    
+    def __init__(self):
+        self.state = {}
+        self.history = {}
+        self.times = {}
+        self.height = 0  # blocks applied, genesis included
+        
+    def apply_block(self, block):
+        """Fold one block's transactions into the index"""
+        if isinstance(block.data, list):
+            for transaction in block.data:
+                self.apply_transaction(transaction, block.index)
+        self.height = block.index + 1
+    
+    def apply_transaction(self, transaction, block_index):
+        user_id = transaction["user_id"]
+        action = transaction["action"]
+        if action in ("REGISTER", "VERIFY"):
+            self.state[user_id] = {
+                "public_key_hash": transaction["public_key_hash"],
+                "status": "ACTIVE",
+                "block": block_index,
+                "transaction_id": transaction["transaction_id"]
+            }
+        elif action == "REVOKE":
+            current = self.state.get(user_id)
+            if current and current["public_key_hash"] == transaction["public_key_hash"]:
+                current.update(status="REVOKED", block=block_index,
+                               transaction_id=transaction["transaction_id"])
+        history = self.history.setdefault(user_id, [])
+        times = self.times.setdefault(user_id, [])
+        when = _epoch(transaction["timestamp"])
+        # Mining order is not timestamp order; at the end (the usual case) this is an append
+        at = bisect_right(times, when)
+        times.insert(at, when)
+        history.insert(at, transaction)
+    
+    @classmethod
+    def rebuild(cls, chain):
+        """Index built from scratch by replaying every block"""
+        index = cls()
+        for block in chain:
+            index.apply_block(block)
+        return index
+    
+    def is_active(self, user_id, public_key_hash):
+        current = self.state.get(user_id)
+        return (current is not None and current["status"] == "ACTIVE" and
+                current["public_key_hash"] == public_key_hash)
+    
+    def query_history(self, user_id, start=None, end=None, offset=0, limit=None):
+        """Transactions with start <= timestamp < end in timestamp order, paged by offset/limit"""
+        transactions = self.history.get(user_id, [])
+        times = self.times.get(user_id, [])
+        lo = 0 if start is None else bisect_left(times, _epoch(start))
+        hi = len(times) if end is None else bisect_left(times, _epoch(end), lo)
+        lo += offset
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return transactions[lo:hi]
 
 class IdentityBlockchain:
     """Blockchain for decentralized identity management"""
@@ -39,6 +291,12 @@ class IdentityBlockchain:
         self.chain = [self.create_genesis_block()]
         self.pending_identities = []
         self.difficulty = 2
+        self.index = IdentityIndex.rebuild(self.chain)
+        self.lock = threading.Lock()  # one block sealed at a time
+        self.miner = Miner()  # or ParallelMiner() to use every core
+        # Validation checkpoint: blocks [0, verified_height) are known good
+        self.verified_height = 1
+        self.verified_tip = self.chain[0].hash
         
     def create_genesis_block(self):
         """Create the first block in the chain"""
@@ -49,97 +307,286 @@ class IdentityBlockchain:
         """Get the most recent block"""
         return self.chain[-1]
     
-    def add_identity_transaction(self, user_id, public_key_hash, action="REGISTER"):
-        """Add identity transaction to pending pool"""
-        transaction = {
+    def new_transaction(self, user_id, public_key_hash, action="REGISTER"):
+        """Build an identity transaction without queuing it"""
+        return {
             "user_id": user_id,
             "public_key_hash": public_key_hash,
             "action": action,  # REGISTER, VERIFY, REVOKE
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "transaction_id": secrets.token_hex(16)
         }
-        
+    
+    def add_identity_transaction(self, user_id, public_key_hash, action="REGISTER"):
+        """Add identity transaction to pending pool"""
+        transaction = self.new_transaction(user_id, public_key_hash, action)
         self.pending_identities.append(transaction)
         return transaction["transaction_id"]
     
+    def mine_block(self, transactions):
+        """Mine the given transactions into a new block and append it"""
+        with self.lock:
+            block = Block(
+                len(self.chain),
+                datetime.now(timezone.utc).isoformat(),
+                transactions,
+                self.get_latest_block().hash
+            )
+            
+            self.miner.mine(block, self.difficulty)
+            
+            self.chain.append(block)
+            self.index.apply_block(block)
+            return block
+    
     def mine_pending_identities(self):
         """Mine pending identity transactions into a new block"""
         if not self.pending_identities:
             return False
-            
-        block = Block(
-            len(self.chain),
-            datetime.now(timezone.utc).isoformat(),
-            self.pending_identities,
-            self.get_latest_block().hash
-        )
         
-        # Simple proof-of-work
-        while block.hash[:self.difficulty] != "0" * self.difficulty:
-            block.nonce += 1
-            block.hash = block.calculate_hash()
-        
-        self.chain.append(block)
-        self.pending_identities = []
+        transactions, self.pending_identities = self.pending_identities, []
+        self.mine_block(transactions)
         return True
     
+    def rebuild_index(self):
+        """Replay the chain into a fresh identity index"""
+        self.index = IdentityIndex.rebuild(self.chain)
+        return self.index
+    
     def verify_identity(self, user_id, public_key_hash):
-        """Verify identity exists and is valid in blockchain"""
-        for block in self.chain[1:]:  # Skip genesis block
-            for transaction in block.data:
-                if (transaction["user_id"] == user_id and 
-                    transaction["public_key_hash"] == public_key_hash and
-                    transaction["action"] in ["REGISTER", "VERIFY"]):
-                    return True
-        return False
-    
-    def get_identity_history(self, user_id):
-        """Get complete identity history for a user"""
-        history = []
-        for block in self.chain[1:]:
-            for transaction in block.data:
-                if transaction["user_id"] == user_id:
-                    history.append(transaction)
-        return history
-    
-    def is_chain_valid(self):
-        """Validate the entire blockchain"""
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i-1]
-            
-            if current_block.hash != current_block.calculate_hash():
-                return False
-            if current_block.previous_hash != previous_block.hash:
-                return False
-                
+        """Verify identity is registered and not revoked (O(1) index lookup)"""
+        return self.index.is_active(user_id, public_key_hash)
+    
+    def get_identity_history(self, user_id, start=None, end=None, offset=0, limit=None):
+        """Identity history for a user, optionally within [start, end) and paged"""
+        return self.index.query_history(user_id, start, end, offset, limit)
+    
+    def is_chain_valid(self, full=False, workers=None):
+        """Validate blocks added since the last check (full=True: audit everything)
+        
+        The height and tip hash of the last validated block are kept, so a
+        routine check only rehashes new blocks. If the block at the
+        checkpoint is no longer the one validated (the chain was replaced),
+        this falls back to a full audit.
+        """
+        height = self.verified_height
+        if (full or height > len(self.chain) or
+                self.chain[height - 1].hash != self.verified_tip):
+            return self.audit_chain(workers)
+        
+        end = len(self.chain)
+        bad = first_invalid_block(self.chain[height:end], self.verified_tip)
+        if bad is not None:
+            return False
+        self.verified_height, self.verified_tip = end, self.chain[end - 1].hash
         return True
+    
+    def audit_chain(self, workers=None):
+        """Rehash the whole chain, block ranges in parallel across processes
+        
+        On success the checkpoint moves to the tip; on failure it moves
+        back to the last block before the first invalid one.
+        """
+        end = len(self.chain)
+        ranges = [(start, min(start + AUDIT_RANGE, end)) for start in range(1, end, AUDIT_RANGE)]
+        jobs = [(self.chain[a:b], self.chain[a - 1].hash) for a, b in ranges]
+        if len(jobs) > 1 and workers != 1:
+            with ProcessPoolExecutor(workers) as pool:
+                results = list(pool.map(first_invalid_block, *zip(*jobs)))
+        else:
+            results = [first_invalid_block(*job) for job in jobs]
+        
+        bad = min((r for r in results if r is not None), default=None)
+        height = end if bad is None else bad
+        self.verified_height, self.verified_tip = height, self.chain[height - 1].hash
+        return bad is None
+
+class BlockScheduler:
+    """Seals submitted transactions into blocks by size or age
+    
+    A block is mined once max_transactions are waiting or the oldest has
+    waited max_age seconds, so N registrations cost about N / max_transactions
+    proof-of-work rounds instead of N. submit() returns at once with the
+    transaction id and a Future that resolves to the block index once the
+    transaction is on the chain: wait on it for confirmation, or carry on
+    optimistically.
+    """
+    
+    def __init__(self, blockchain, max_transactions=1000, max_age=0.5):
+        self.blockchain = blockchain
+        self.max_transactions = max_transactions
+        self.max_age = max_age
+        self.pending = []  # (transaction, future, submitted_at)
+        self._submitted = 0  # transactions queued so far / taken off the queue and settled
+        self._settled = 0
+        self.blocks = 0
+        self.transactions = 0
+        self._flush = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name="block-scheduler", daemon=True)
+        self._worker.start()
+    
+    def submit(self, user_id, public_key_hash, action="REGISTER"):
+        """Queue a transaction; returns (transaction_id, Future of its block index)"""
+        transaction = self.blockchain.new_transaction(user_id, public_key_hash, action)
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("scheduler is closed")
+            self.pending.append((transaction, future, time.monotonic()))
+            self._submitted += 1
+            if len(self.pending) >= self.max_transactions or len(self.pending) == 1:
+                self._cond.notify_all()  # the worker and flush() callers share the condition
+        return transaction["transaction_id"], future
+    
+    def _next_batch(self):
+        with self._cond:
+            while not self.pending:
+                if self._closed:
+                    return None
+                self._cond.wait()
+            deadline = self.pending[0][2] + self.max_age
+            while (len(self.pending) < self.max_transactions and
+                   not self._flush and not self._closed):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self.pending[:self.max_transactions]
+            del self.pending[:self.max_transactions]
+            if not self.pending:
+                self._flush = False
+            return batch
+    
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._seal(batch)
+            finally:
+                with self._cond:
+                    self._settled += len(batch)
+                    self._cond.notify_all()
+    
+    def _seal(self, batch):
+        # Callers may have cancelled their futures while queued; those stay off the chain
+        live = [(transaction, future) for transaction, future, _ in batch
+                if future.set_running_or_notify_cancel()]
+        if not live:
+            return
+        try:
+            block = self.blockchain.mine_block([transaction for transaction, _ in live])
+        except Exception as e:
+            for _, future in live:
+                future.set_exception(e)
+            return
+        self.blocks += 1
+        self.transactions += len(live)
+        for _, future in live:
+            future.set_result(block.index)
+    
+    def flush(self, timeout=None):
+        """Seal everything submitted so far without waiting for max_age, and wait for it"""
+        with self._cond:
+            target = self._submitted
+            if self.pending:
+                self._flush = True
+                self._cond.notify_all()
+            # The worker may already hold the last batch, so wait until it is settled,
+            # not just off the queue
+            if not self._cond.wait_for(lambda: self._settled >= target, timeout):
+                raise TimeoutError("blocks not sealed within timeout")
+    
+    def close(self):
+        """Seal what is pending, then stop the worker"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
 
 class DecentralizedIdentityManager:
     """Manager for decentralized Zero Trust identities"""
     
-    def __init__(self):
-        self.blockchain = IdentityBlockchain()
+    def __init__(self, blockchain=None, scheduler=None):
+        self.blockchain = blockchain or IdentityBlockchain()
+        self.scheduler = scheduler  # BlockScheduler over self.blockchain, or None to mine per call
         self.identities = {}
-        
-    def register_identity(self, user_id, quantum_identity):
-        """Register quantum-resistant identity on blockchain"""
-        transaction_id = self.blockchain.add_identity_transaction(
-            user_id, quantum_identity.identity_hash, "REGISTER"
-        )
-        
-        # Mine the transaction
-        self.blockchain.mine_pending_identities()
-        
+    
+    def _record(self, user_id, public_key_hash, action, wait):
+        """Put one transaction on the chain; returns (transaction_id, confirmation future or None)"""
+        if self.scheduler is None:
+            transaction_id = self.blockchain.add_identity_transaction(user_id, public_key_hash, action)
+            self.blockchain.mine_pending_identities()
+            return transaction_id, None
+        transaction_id, confirmation = self.scheduler.submit(user_id, public_key_hash, action)
+        if wait:
+            confirmation.result()
+        return transaction_id, confirmation
+    
+    def _store(self, user_id, quantum_identity, confirmation):
         # Store locally for quick access
-        self.identities[user_id] = {
+        record = self.identities[user_id] = {
             'quantum_identity': quantum_identity,
-            'blockchain_verified': True,
+            'blockchain_verified': confirmation is None,
+            'confirmation': confirmation,
             'registration_time': datetime.now(timezone.utc).isoformat()
         }
+        if confirmation is not None:
+            # Runs at once if the block is already sealed, else from the scheduler thread
+            confirmation.add_done_callback(
+                lambda f: record.__setitem__(
+                    'blockchain_verified', not f.cancelled() and f.exception() is None))
+        
+    def register_identity(self, user_id, quantum_identity, wait=True):
+        """Register quantum-resistant identity on blockchain
         
+        With a scheduler and wait=False this returns before the block is
+        sealed; access is refused until identities[user_id]['confirmation']
+        resolves.
+        """
+        transaction_id, confirmation = self._record(
+            user_id, quantum_identity.identity_hash, "REGISTER", wait
+        )
+        self._store(user_id, quantum_identity, confirmation)
         return transaction_id
     
+    def register_identities(self, quantum_identities, wait=True):
+        """Bulk onboarding: many identities in as few blocks as possible"""
+        if self.scheduler is None:
+            transaction_ids = [
+                self.blockchain.add_identity_transaction(q.user_id, q.identity_hash, "REGISTER")
+                for q in quantum_identities
+            ]
+            self.blockchain.mine_pending_identities()
+            for q in quantum_identities:
+                self._store(q.user_id, q, None)
+            return transaction_ids
+        
+        transaction_ids = []
+        confirmations = []
+        for q in quantum_identities:
+            transaction_id, confirmation = self.scheduler.submit(q.user_id, q.identity_hash, "REGISTER")
+            self._store(q.user_id, q, confirmation)
+            transaction_ids.append(transaction_id)
+            confirmations.append(confirmation)
+        if wait:
+            self.scheduler.flush()
+            wait_futures(confirmations)
+            for confirmation in confirmations:
+                confirmation.result()  # re-raise a failed block
+            for q in quantum_identities:
+                self.identities[q.user_id]['blockchain_verified'] = True
+        return transaction_ids
+    
     def verify_access_request(self, user_id, message, signature):
         """Verify access request using blockchain identity"""
         # Check if identity exists and is verified
@@ -171,14 +618,13 @@ class DecentralizedIdentityManager:
             "trust_score": 95  # High trust from dual verification
         }
     
-    def revoke_identity(self, user_id):
+    def revoke_identity(self, user_id, wait=True):
         """Revoke identity on blockchain"""
         if user_id in self.identities:
             quantum_identity = self.identities[user_id]['quantum_identity']
-            transaction_id = self.blockchain.add_identity_transaction(
-                user_id, quantum_identity.identity_hash, "REVOKE"
+            transaction_id, _ = self._record(
+                user_id, quantum_identity.identity_hash, "REVOKE", wait
             )
-            self.blockchain.mine_pending_identities()
             del self.identities[user_id]
             return transaction_id
         return None
@@ -234,6 +680,37 @@ def demonstrate_blockchain_identity():
         user_to_revoke.user_id, message, signature
     )
     print(f"   Revoked identity access: {revoked_verification['allowed']}")
+    
+    # Bulk onboarding: one block per transaction vs. scheduled blocks
+    print("\n6. Bulk onboarding 200 identities...")
+    recruits = [QuantumResistantIdentity(f"onboard_user_{i}") for i in range(200)]
+    start = time.perf_counter()
+    per_call = DecentralizedIdentityManager()
+    for recruit in recruits:
+        per_call.register_identity(recruit.user_id, recruit)
+    per_call_time = time.perf_counter() - start
+    
+    chain = IdentityBlockchain()
+    with BlockScheduler(chain, max_transactions=100, max_age=0.05) as scheduler:
+        start = time.perf_counter()
+        DecentralizedIdentityManager(chain, scheduler).register_identities(recruits)
+        scheduled_time = time.perf_counter() - start
+    print(f"   One block per registration: {len(per_call.blockchain.chain) - 1} blocks, {per_call_time:.2f}s")
+    print(f"   Block scheduler: {len(chain.chain) - 1} blocks, {scheduled_time:.2f}s")
+    
+    # Proof-of-work across every core
+    print("\n7. Mining at difficulty 4...")
+    for name, miner in (("Single core", Miner()), ("Parallel", ParallelMiner())):
+        chain = IdentityBlockchain()
+        chain.difficulty = 4
+        chain.miner = miner
+        chain.add_identity_transaction("bench_user", recruits[0].identity_hash)
+        chain.mine_pending_identities()
+        if isinstance(miner, ParallelMiner):
+            miner.close()
+            name = f"{name} (processes: {miner.workers})"
+        print(f"   {name}: {miner.stats['hashes_per_second']:,.0f} hashes/s, "
+              f"sealed in {miner.stats['time_to_seal']:.2f}s")
 
 if __name__ == "__main__":
     demonstrate_blockchain_identity()
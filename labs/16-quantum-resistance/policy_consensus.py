@@ -7,16 +7,32 @@ Quantum-resistant policy management integrated with blockchain
 import hashlib
 import json
 import time
-from datetime import datetime
+from datetime import datetime, timezone
 
 class PolicyConsensus:
     """Distributed consensus for quantum security policies"""
     
-    def __init__(self, node_id, blockchain):
+    def __init__(self, node_id, blockchain, scheduler=None):
         self.node_id = node_id
         self.blockchain = blockchain
+        self.scheduler = scheduler  # BlockScheduler over blockchain, or None to mine per record
         self.policies = {}
+        self.confirmations = {}  # transaction_id -> Future of its block index
         self.consensus_threshold = 0.75
+    
+    def _record_on_chain(self, policy_hash, action):
+        """Record a policy event; with a scheduler it is batched and not waited for"""
+        if self.scheduler is None:
+            transaction_id = self.blockchain.add_identity_transaction(
+                f"policy_{policy_hash[:16]}", policy_hash, action
+            )
+            self.blockchain.mine_pending_identities()
+            return transaction_id
+        transaction_id, confirmation = self.scheduler.submit(
+            f"policy_{policy_hash[:16]}", policy_hash, action
+        )
+        self.confirmations[transaction_id] = confirmation
+        return transaction_id
         
     def propose_quantum_policy(self, policy_data, quantum_signature):
         """Propose new quantum-resistant policy with blockchain verification"""
@@ -35,12 +51,7 @@ class PolicyConsensus:
         }
         
         # Record policy proposal on blockchain
-        self.blockchain.add_identity_transaction(
-            f"policy_{policy_hash[:16]}",
-            policy_hash,
-            "POLICY_PROPOSAL"
-        )
-        self.blockchain.mine_pending_identities()
+        policy_record['transaction_id'] = self._record_on_chain(policy_hash, "POLICY_PROPOSAL")
         
         self.policies[policy_hash] = policy_record
         return policy_record
@@ -82,15 +93,10 @@ class PolicyConsensus:
         
         if approval_ratio >= self.consensus_threshold:
             policy['status'] = 'approved'
-            policy['approved_at'] = datetime.utcnow().isoformat()
+            policy['approved_at'] = datetime.now(timezone.utc).isoformat()
             
             # Record approval on blockchain
-            self.blockchain.add_identity_transaction(
-                f"policy_{policy_hash[:16]}",
-                policy_hash,
-                "POLICY_APPROVED"
-            )
-            self.blockchain.mine_pending_identities()
+            self._record_on_chain(policy_hash, "POLICY_APPROVED")
             
             return True
         return False
@@ -131,7 +137,7 @@ def demonstrate_policy_consensus():
     voter2 = QuantumResistantIdentity("policy_voter_2")
     
     # Register identities
-    id_manager = DecentralizedIdentityManager()
+    id_manager = DecentralizedIdentityManager(blockchain)
     id_manager.register_identity(admin.user_id, admin)
     id_manager.register_identity(voter1.user_id, voter1)
     id_manager.register_identity(voter2.user_id, voter2)
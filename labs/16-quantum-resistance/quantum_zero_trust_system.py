@@ -26,7 +26,7 @@ class QuantumZeroTrustSystem:
         
         # Initialize all components
         self.blockchain = IdentityBlockchain()
-        self.id_manager = DecentralizedIdentityManager()
+        self.id_manager = DecentralizedIdentityManager(self.blockchain)
         self.auth_system = QuantumPolicyEngine()
         self.consensus = PolicyConsensus("main-node-1", self.blockchain)
         self.threat_monitor = QuantumThreatMonitor()
@@ -48,6 +48,17 @@ class QuantumZeroTrustSystem:
             'quantum_secure': True
         }
     
+    def register_quantum_identities(self, user_ids, wait=True):
+        """Bulk onboarding: identities are sealed into as few blocks as possible"""
+        quantum_identities = [QuantumResistantIdentity(user_id) for user_id in user_ids]
+        transaction_ids = self.id_manager.register_identities(quantum_identities, wait)
+        return [{
+            'user_id': q.user_id,
+            'identity_hash': q.identity_hash,
+            'transaction_id': transaction_id,
+            'quantum_secure': True
+        } for q, transaction_id in zip(quantum_identities, transaction_ids)]
+    
     def process_access_request(self, user_id, resource, message):
         """Process Zero Trust access request with quantum verification"""
         print(f"Processing access request from {user_id}")
@@ -156,8 +167,13 @@ class QuantumZeroTrustSystem:
             'timestamp': datetime.now(timezone.utc).isoformat()
         }
     
-    def system_status_report(self):
-        """Generate comprehensive system status report"""
+    def system_status_report(self, full_audit=False):
+        """Generate comprehensive system status report
+        
+        Chain validation is incremental (only blocks added since the last
+        report are rehashed); full_audit=True rehashes the whole chain in
+        parallel.
+        """
         return {
             'system_name': self.system_name,
             'operational_time': str(datetime.now(timezone.utc) - self.start_time),
@@ -165,7 +181,8 @@ class QuantumZeroTrustSystem:
             'zero_trust_enforced': self.zero_trust_enforced,
             'blockchain_health': {
                 'chain_length': len(self.blockchain.chain),
-                'valid': self.blockchain.is_chain_valid(),
+                'valid': self.blockchain.is_chain_valid(full=full_audit),
+                'verified_height': self.blockchain.verified_height,
                 'identities_registered': len(self.id_manager.identities)
             },
             'threat_status': self.threat_monitor.generate_threat_report(),
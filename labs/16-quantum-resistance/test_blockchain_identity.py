@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Lesson 16: Blockchain Identity Regression Tests
+Run directly (python3 test_blockchain_identity.py) or under pytest
+"""
+
+import time
+
+from blockchain_identity import (BlockScheduler, DecentralizedIdentityManager, IdentityBlockchain,
+                                 merkle_root)
+
+class SlowIdentity:
+    """Identity whose user_id lookup yields the GIL, so the scheduler's worker
+    takes the batch off the queue before register_identities reaches flush()"""
+    
+    def __init__(self, i):
+        self._user_id = f"user_{i}"
+        self.identity_hash = f"{i:064x}"
+    
+    @property
+    def user_id(self):
+        time.sleep(0.02)
+        return self._user_id
+
+def test_bulk_registration_waits_for_block():
+    chain = IdentityBlockchain()
+    chain.difficulty = 5  # the worker is still mining when flush() runs
+    recruits = [SlowIdentity(i) for i in range(3)]
+    # Full batch seals at once: the worker takes all three off the queue while
+    # the last SlowIdentity is still being stored, so flush() sees an empty queue
+    with BlockScheduler(chain, max_transactions=len(recruits), max_age=60) as scheduler:
+        manager = DecentralizedIdentityManager(chain, scheduler)
+        manager.register_identities(recruits, wait=True)
+        # Checked right after the call returns: every transaction is already sealed
+        assert len(chain.chain) == 2
+        assert len(chain.chain[1].data) == len(recruits)
+        assert all(manager.identities[q.user_id]['blockchain_verified'] for q in recruits)
+        assert all(chain.verify_identity(q.user_id, q.identity_hash) for q in recruits)
+
+def test_cancelled_submit_leaves_scheduler_running():
+    chain = IdentityBlockchain()
+    chain.difficulty = 1
+    with BlockScheduler(chain, max_transactions=3, max_age=60) as scheduler:
+        futures = [scheduler.submit(f"user_{i}", f"{i:064x}")[1] for i in range(2)]
+        assert futures[0].cancel()
+        _, last = scheduler.submit("user_2", f"{2:064x}")  # fills the batch
+        assert last.result(timeout=10) == futures[1].result(timeout=10) == 1
+        assert not chain.verify_identity("user_0", f"{0:064x}")
+        # The worker survived: a later submit still seals and flush() returns
+        _, later = scheduler.submit("user_3", f"{3:064x}")
+        scheduler.flush(timeout=10)
+        assert later.result(timeout=0) == 2
+        assert chain.verify_identity("user_3", f"{3:064x}")
+
+def test_unwaited_registration_verified_once_sealed():
+    chain = IdentityBlockchain()
+    chain.difficulty = 1
+    identity = SlowIdentity(0)
+    with BlockScheduler(chain, max_transactions=10, max_age=60) as scheduler:
+        manager = DecentralizedIdentityManager(chain, scheduler)
+        manager.register_identity(identity.user_id, identity, wait=False)
+        record = manager.identities[identity.user_id]
+        assert not record['blockchain_verified']
+        scheduler.flush(timeout=10)
+        record['confirmation'].result(timeout=0)
+        assert record['blockchain_verified']
+
+def test_duplicated_transaction_fails_validation():
+    chain = IdentityBlockchain()
+    chain.difficulty = 1
+    for i in range(3):
+        chain.add_identity_transaction(f"user_{i}", f"{i:064x}")
+    chain.mine_pending_identities()
+    assert chain.is_chain_valid(full=True)
+    
+    block = chain.chain[1]
+    assert merkle_root(block.data + block.data[-1:]) != merkle_root(block.data)
+    block.data.append(dict(block.data[-1]))
+    assert not chain.is_chain_valid(full=True)
+
+def test_history_range_with_out_of_order_timestamps():
+    chain = IdentityBlockchain()
+    chain.difficulty = 1
+    stamps = ["2025-01-01T10:00:00+00:00", "2025-01-01T12:00:00+00:00",
+              "2025-01-01T11:00:00+00:00"]  # the 11:00 transaction is mined last
+    for i, stamp in enumerate(stamps):
+        transaction = chain.new_transaction("user_0", f"{i:064x}")
+        transaction["timestamp"] = stamp
+        chain.mine_block([transaction])
+    
+    found = chain.get_identity_history("user_0", "2025-01-01T10:30:00+00:00",
+                                       "2025-01-01T11:30:00+00:00")
+    assert [t["timestamp"] for t in found] == [stamps[2]]
+    assert [t["timestamp"] for t in chain.get_identity_history("user_0")] == sorted(stamps)
+    assert chain.get_identity_history("user_0", offset=1, limit=1)[0]["timestamp"] == stamps[2]
+
+if __name__ == "__main__":
+    tests = [(name, f) for name, f in list(globals().items()) if name.startswith("test_")]
+    for name, test in tests:
+        test()
+        print(f"✅ {name}")